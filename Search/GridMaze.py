@@ -0,0 +1,225 @@
+'''
+    Grid mazes too large for one Node per cell.
+
+    The maze is one bytearray with a byte per cell, padded with a wall
+    column on the right and a wall row above and below so every cell has
+    four in-bounds neighbours. Cells are integer indices into it, and
+    searches keep their visited set and parents in a second bytearray
+    holding the move that reached each cell, so BFS needs about two bytes
+    per cell and A* four more for its path costs.
+
+    Maze files use the lecture format read as MazeProblem reads them:
+    'A' start, 'B' goal, ' ' open, any other character a wall.
+'''
+import heapq
+import sys
+import time
+from array import array
+
+from Search import SearchStats
+
+# Byte values of the maze and of the search's came-from array
+OPEN = 0
+UP, DOWN, LEFT, RIGHT, START = 1, 2, 3, 4, 5
+WALL = 255
+
+ACTIONS = {UP: "up", DOWN: "down", LEFT: "left", RIGHT: "right"}
+
+# Maps every byte of a maze file to OPEN or WALL
+_CELL_BYTES = bytes(
+    OPEN if chr(byte) in " AB" else WALL for byte in range(256)
+)
+
+
+class GridMaze():
+
+    def __init__(self, cells, height, width, start, goal):
+        self.cells = cells
+        self.height = height
+        self.width = width
+        self.stride = width + 1 ## Each row ends in a wall cell
+        self.start = start
+        self.goal = goal
+        # The move into a cell and the index offset back to its parent
+        self.moves = [
+            (UP, self.stride), (DOWN, -self.stride), (LEFT, 1), (RIGHT, -1)
+        ]
+
+    @classmethod
+    def load(cls, filename):
+        with open(filename) as f:
+            contents = f.read()
+        # Split and decoded as MazeProblem does, then one byte per
+        # character, any non-ASCII one becoming a '?' wall. Blank lines,
+        # trailing ones too, are open rows.
+        lines = [
+            line.encode("ascii", "replace") for line in contents.splitlines()
+        ]
+        if sum(line.count(b"A") for line in lines) != 1:
+            raise Exception("maze must have exactly one start point")
+        if sum(line.count(b"B") for line in lines) != 1:
+            raise Exception("maze must have exactly one goal")
+
+        height = len(lines)
+        width = max(len(line) for line in lines)
+        stride = width + 1
+        cells = bytearray([WALL]) * (stride * (height + 2))
+        for row, line in enumerate(lines):
+            begin = (row + 1) * stride
+            # Short lines are open to the right, as in the lecture maze
+            cells[begin:begin + width] = (
+                line.translate(_CELL_BYTES) + bytes(width - len(line))
+            )
+            if b"A" in line:
+                start = begin + line.index(b"A")
+            if b"B" in line:
+                goal = begin + line.index(b"B")
+        return cls(cells, height, width, start, goal)
+
+    def cell(self, row, col):
+        '''
+            Returns the cell index of a (row, col) position.
+        '''
+        return (row + 1) * self.stride + col
+
+    def position(self, cell):
+        '''
+            Returns the (row, col) position of a cell index.
+        '''
+        row, col = divmod(cell, self.stride)
+        return row - 1, col
+
+    def solve(self, strategy="bfs"):
+        '''
+            Returns (path, stats), where path is the list of cells from the
+            start to the goal, or None if there is no solution. Both
+            strategies find a shortest path.
+        '''
+        if strategy == "bfs":
+            search = self._breadth_first_search
+        elif strategy == "astar":
+            search = self._a_star_search
+        else:
+            raise ValueError(f"Unknown strategy {strategy!r}, expected bfs or astar")
+        stats = SearchStats(strategy)
+        start = time.perf_counter()
+        came_from = bytearray(self.cells)
+        came_from[self.start] = START
+        found = search(came_from, stats)
+        stats.elapsed = time.perf_counter() - start
+        return (self._path(came_from) if found else None), stats
+
+    def _breadth_first_search(self, came_from, stats):
+        '''
+            Expands the maze a layer at a time, with each layer held
+            as a flat array of cell indices.
+        '''
+        goal = self.goal
+        moves = [(code, -offset) for code, offset in self.moves]
+        layer = array("i", [self.start])
+        stats.peak_frontier = 1
+        while layer:
+            if goal in layer:
+                return True
+            next_layer = array("i")
+            for cell in layer:
+                for code, step in moves:
+                    neighbor = cell + step
+                    if not came_from[neighbor]:
+                        came_from[neighbor] = code
+                        next_layer.append(neighbor)
+            stats.nodes_expanded += len(layer)
+            stats.nodes_generated += len(next_layer)
+            stats.peak_frontier = max(stats.peak_frontier, len(next_layer))
+            layer = next_layer
+        return False
+
+    def _a_star_search(self, came_from, stats):
+        '''
+            A* with the Manhattan distance. Path costs are kept in a flat
+            array and each frontier entry is packed into a single integer
+            ordered by f, then by larger g, so ties go deepest first.
+        '''
+        stride, goal = self.stride, self.goal
+        goal_row, goal_col = divmod(goal, stride)
+        moves = [(code, -offset) for code, offset in self.moves]
+        size = len(came_from)
+        cost = array("i", [-1]) * size
+        cost[self.start] = 0
+
+        def heuristic(cell):
+            row, col = divmod(cell, stride)
+            return abs(row - goal_row) + abs(col - goal_col)
+
+        # Entry = (f * size + (size - 1 - g)) * size + cell
+        frontier = [(heuristic(self.start) * size + size - 1) * size + self.start]
+        stats.peak_frontier = 1
+        while frontier:
+            key, cell = divmod(heapq.heappop(frontier), size)
+            g = size - 1 - key % size
+            if g > cost[cell]:
+                continue
+            if cell == goal:
+                return True
+            stats.nodes_expanded += 1
+            for code, step in moves:
+                neighbor = cell + step
+                if came_from[neighbor] == WALL:
+                    continue
+                known = cost[neighbor]
+                if known != -1 and known <= g + 1:
+                    continue
+                cost[neighbor] = g + 1
+                came_from[neighbor] = code
+                f = g + 1 + heuristic(neighbor)
+                heapq.heappush(frontier, (f * size + size - 2 - g) * size + neighbor)
+                stats.nodes_generated += 1
+            if len(frontier) > stats.peak_frontier:
+                stats.peak_frontier = len(frontier)
+        return False
+
+    def _path(self, came_from):
+        offsets = dict(self.moves)
+        path = [self.goal]
+        cell = self.goal
+        while came_from[cell] != START:
+            cell += offsets[came_from[cell]]
+            path.append(cell)
+        path.reverse()
+        return path
+
+    def actions(self, path):
+        '''
+            Returns the moves ("up", "down", "left", "right") along a path.
+        '''
+        codes = {-offset: code for code, offset in self.moves}
+        return [ACTIONS[codes[b - a]] for a, b in zip(path, path[1:])]
+
+    def render(self, path=(), out=sys.stdout):
+        '''
+            Writes the maze to `out` a row at a time with the
+            path marked '*', walls '#' and open cells ' '.
+        '''
+        marked = bytearray(self.cells)
+        for cell in path:
+            marked[cell] = ord("*")
+        marked[self.start] = ord("A")
+        marked[self.goal] = ord("B")
+        table = bytearray(range(256))
+        table[OPEN], table[WALL] = ord(" "), ord("#")
+        for row in range(self.height):
+            begin = (row + 1) * self.stride
+            line = marked[begin:begin + self.width].translate(table)
+            out.write(line.decode("ascii") + "\n")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python GridMaze.py maze.txt [bfs|astar]")
+    maze = GridMaze.load(sys.argv[1])
+    path, stats = maze.solve(sys.argv[2] if len(sys.argv) == 3 else "bfs")
+    if path is None:
+        sys.exit(f"No solution ({stats})")
+    maze.render(path)
+    print(f"Steps: {len(path) - 1}")
+    print(stats)
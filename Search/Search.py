@@ -1,41 +1,598 @@
 '''
     Code from Lecture 0: Search
+
+    Grown into a small search engine: a problem describes its states through
+    actions, result, goal_test, step_cost and heuristic, and `search` solves
+    it with depth-first, breadth-first, greedy best-first, uniform-cost or
+    A* search, recording how much work the strategy did.
+
+    For state spaces whose frontier does not fit in memory there are also
+    iterative-deepening DFS and IDA*, which hold only the current path, and
+    an SMA*-style search that keeps at most a fixed number of nodes and
+    regenerates the ones it had to forget.
 '''
+import heapq
+import itertools
+import math
 import sys
+import time
+from collections import deque
+
 
 class Node():
-    def __init__(self, state, parent, action):
+    __slots__ = ("state", "parent", "action", "cost", "depth")
+
+    def __init__(self, state, parent, action, cost=0):
         self.state = state
         self.parent = parent
         self.action = action
+        self.cost = cost ## Total step cost from the initial state
+        self.depth = parent.depth + 1 if parent is not None else 0
+
+    def path(self):
+        '''
+            Returns the (actions, states) taken from the initial state to this node.
+        '''
+        actions, states = [], []
+        node = self
+        while node.parent is not None:
+            actions.append(node.action)
+            states.append(node.state)
+            node = node.parent
+        actions.reverse()
+        states.reverse()
+        return actions, states
+
 
 class StackFrontier():
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+        # Counts of each state currently in the frontier, for O(1) lookups
+        self.states = {}
 
-    def add(self,node):
-        self.froniter.append(node)
+    def add(self, node, priority=0):
+        self.frontier.append(node)
+        self._track(node.state)
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
-    
+        return state in self.states
+
     def empty(self):
         return len(self.frontier) == 0
-    
+
+    def __len__(self):
+        return len(self.frontier)
+
     def remove(self):
         if self.empty():
-            raise Exception("Empty Froniter")
+            raise Exception("Empty Frontier")
         else:
-            node = self.frontier[-1] 
-            self.frontier = self.frontier[:-1] ## Removing the last item from the stack (DFS)
+            node = self.frontier.pop() ## Removing the last item from the stack (DFS)
+            self._untrack(node.state)
             return node
 
+    def _track(self, state):
+        self.states[state] = self.states.get(state, 0) + 1
+
+    def _untrack(self, state):
+        count = self.states[state] - 1
+        if count:
+            self.states[state] = count
+        else:
+            del self.states[state]
+
+
 class QueueFrontier(StackFrontier):
-    
+
+    def remove(self):
+        if self.empty():
+            raise Exception("Empty Frontier")
+        else:
+            node = self.frontier.popleft() ## Removing the first item from the queue (BFS)
+            self._untrack(node.state)
+            return node
+
+
+class PriorityFrontier(StackFrontier):
+    '''
+        Removes the node with the lowest priority first, oldest first on ties.
+    '''
+
+    def __init__(self):
+        super().__init__()
+        self.frontier = []
+        self.counter = itertools.count()
+
+    def add(self, node, priority=0):
+        heapq.heappush(self.frontier, (priority, next(self.counter), node))
+        self._track(node.state)
+
     def remove(self):
         if self.empty():
-            raise Exception("Empty Froniter")
+            raise Exception("Empty Frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:] ## Removing the first item from the queue (BFS)
-            return node
\ No newline at end of file
+            node = heapq.heappop(self.frontier)[2]
+            self._untrack(node.state)
+            return node
+
+
+class Problem():
+    '''
+        A search problem. Subclasses set `initial` and override actions,
+        result and goal_test; every step costs 1 and the heuristic is 0
+        unless step_cost and heuristic are overridden too.
+    '''
+
+    def __init__(self, initial):
+        self.initial = initial
+
+    def actions(self, state):
+        raise NotImplementedError
+
+    def result(self, state, action):
+        raise NotImplementedError
+
+    def goal_test(self, state):
+        raise NotImplementedError
+
+    def step_cost(self, state, action, result):
+        return 1
+
+    def heuristic(self, state):
+        return 0
+
+
+class SearchStats():
+    '''
+        Work done by one search.
+    '''
+    __slots__ = ("strategy", "nodes_expanded", "nodes_generated",
+                 "peak_frontier", "elapsed", "iterations", "reexpansions")
+
+    def __init__(self, strategy):
+        self.strategy = strategy
+        self.nodes_expanded = 0
+        self.nodes_generated = 0
+        self.peak_frontier = 0
+        self.elapsed = 0.0 ## Seconds
+        self.iterations = 1
+        self.reexpansions = 0 ## Expansions repeating earlier work
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return (f"SearchStats({self.strategy}: {self.nodes_expanded} expanded, "
+                f"{self.nodes_generated} generated, {self.reexpansions} "
+                f"re-expanded, peak frontier {self.peak_frontier}, "
+                f"{self.iterations} iterations, {self.elapsed:.4f}s)")
+
+
+# Each strategy is a frontier class and the priority of a node under it,
+# or None for the uninformed strategies that ignore priorities
+STRATEGIES = {
+    "dfs": (StackFrontier, None),
+    "bfs": (QueueFrontier, None),
+    "greedy": (PriorityFrontier, lambda problem, node: problem.heuristic(node.state)),
+    "ucs": (PriorityFrontier, lambda problem, node: node.cost),
+    "astar": (PriorityFrontier,
+              lambda problem, node: node.cost + problem.heuristic(node.state)),
+}
+
+
+def search(problem, strategy="bfs", memory_limit=None):
+    '''
+        Solves `problem` with one of the STRATEGIES or
+        MEMORY_BOUNDED_STRATEGIES and returns (node, stats), where node is
+        the goal node or None if there is no solution. Uniform-cost search,
+        and A*, IDA* and SMA* with an admissible heuristic, return a
+        cheapest solution; BFS and IDDFS return one with the fewest steps.
+
+        `memory_limit` caps the nodes a memory-bounded strategy holds at
+        once: the path length for IDDFS and IDA*, and the tree size for
+        SMA*. Solutions that do not fit are not found.
+    '''
+    if strategy not in STRATEGIES and strategy not in MEMORY_BOUNDED_STRATEGIES:
+        raise ValueError(f"Unknown strategy {strategy!r}, expected one of "
+                         f"{', '.join([*STRATEGIES, *MEMORY_BOUNDED_STRATEGIES])}")
+    if memory_limit is not None and memory_limit < 1:
+        raise ValueError("memory_limit must be at least 1")
+    stats = SearchStats(strategy)
+    start = time.perf_counter()
+    try:
+        if strategy in MEMORY_BOUNDED_STRATEGIES:
+            bounded = MEMORY_BOUNDED_STRATEGIES[strategy]
+            return bounded(problem, memory_limit, stats), stats
+        frontier_class, priority = STRATEGIES[strategy]
+        if priority is None:
+            return _uninformed_search(problem, frontier_class(), stats), stats
+        return _best_first_search(problem, priority, stats), stats
+    finally:
+        stats.elapsed = time.perf_counter() - start
+
+
+def _uninformed_search(problem, frontier, stats):
+    '''
+        The lecture's graph search: goal-test nodes as they are removed,
+        and skip states already explored or waiting in the frontier.
+    '''
+    frontier.add(Node(problem.initial, None, None))
+    stats.peak_frontier = 1
+    explored = set()
+    while not frontier.empty():
+        node = frontier.remove()
+        if problem.goal_test(node.state):
+            return node
+        explored.add(node.state)
+        stats.nodes_expanded += 1
+        for action in problem.actions(node.state):
+            state = problem.result(node.state, action)
+            if state in explored or frontier.contains_state(state):
+                continue
+            cost = node.cost + problem.step_cost(node.state, action, state)
+            frontier.add(Node(state, node, action, cost))
+            stats.nodes_generated += 1
+        stats.peak_frontier = max(stats.peak_frontier, len(frontier))
+    return None
+
+
+def _best_first_search(problem, priority, stats):
+    '''
+        Best-first graph search keeping the cheapest known cost of each
+        state. A node whose state has since been reached more cheaply is
+        skipped when removed instead of being deleted from the frontier.
+    '''
+    frontier = PriorityFrontier()
+    root = Node(problem.initial, None, None)
+    frontier.add(root, priority(problem, root))
+    stats.peak_frontier = 1
+    reached = {root.state: 0}
+    while not frontier.empty():
+        node = frontier.remove()
+        if node.cost > reached[node.state]:
+            continue
+        if problem.goal_test(node.state):
+            return node
+        stats.nodes_expanded += 1
+        for action in problem.actions(node.state):
+            state = problem.result(node.state, action)
+            cost = node.cost + problem.step_cost(node.state, action, state)
+            if state in reached and reached[state] <= cost:
+                continue
+            reached[state] = cost
+            child = Node(state, node, action, cost)
+            frontier.add(child, priority(problem, child))
+            stats.nodes_generated += 1
+        stats.peak_frontier = max(stats.peak_frontier, len(frontier))
+    return None
+
+
+def _depth_first_contour(problem, bound, value, stats):
+    '''
+        Depth-first search from the initial state over nodes whose
+        `value(node)` is at most `bound`, skipping states already on the
+        current path. Returns (goal, exceeded), where exceeded is the
+        smallest value found above the bound, or inf if none was.
+    '''
+    root = Node(problem.initial, None, None)
+    if problem.goal_test(root.state):
+        return root, math.inf
+    exceeded = math.inf
+    on_path = {root.state}
+    stack = [(root, iter(problem.actions(root.state)))]
+    stats.nodes_expanded += 1
+    while stack:
+        node, actions = stack[-1]
+        action = next(actions, None)
+        if action is None:
+            stack.pop()
+            on_path.discard(node.state)
+            continue
+        state = problem.result(node.state, action)
+        if state in on_path:
+            continue
+        cost = node.cost + problem.step_cost(node.state, action, state)
+        child = Node(state, node, action, cost)
+        stats.nodes_generated += 1
+        child_value = value(child)
+        if child_value > bound:
+            exceeded = min(exceeded, child_value)
+            continue
+        if problem.goal_test(state):
+            return child, exceeded
+        stack.append((child, iter(problem.actions(state))))
+        on_path.add(state)
+        stats.nodes_expanded += 1
+        stats.peak_frontier = max(stats.peak_frontier, len(stack))
+    return None, exceeded
+
+
+def _iterative_deepening(problem, memory_limit, stats, value, bound):
+    '''
+        Repeats the depth-first contour search with the bound raised to
+        the smallest value that exceeded it, until a goal is found, no
+        node exceeded the bound, or the path would outgrow the memory limit.
+    '''
+    max_depth = math.inf if memory_limit is None else memory_limit - 1
+    stats.iterations = 0
+    while True:
+        stats.iterations += 1
+        node, exceeded = _depth_first_contour(
+            problem, bound,
+            lambda child: math.inf if child.depth > max_depth else value(child),
+            stats
+        )
+        if node is not None or exceeded == math.inf:
+            return node
+        # Everything expanded so far is expanded again next iteration
+        stats.reexpansions = stats.nodes_expanded
+        bound = exceeded
+
+
+def _iterative_deepening_search(problem, memory_limit, stats):
+    '''
+        Depth-limited DFS with the limit raised one step at a time.
+    '''
+    return _iterative_deepening(
+        problem, memory_limit, stats, lambda node: node.depth, 0
+    )
+
+
+def _ida_star_search(problem, memory_limit, stats):
+    '''
+        DFS bounded by f = cost + heuristic, with the bound raised to the
+        smallest f that exceeded it.
+    '''
+    return _iterative_deepening(
+        problem, memory_limit, stats,
+        lambda node: node.cost + problem.heuristic(node.state),
+        problem.heuristic(problem.initial)
+    )
+
+
+class _BoundedNode(Node):
+    '''
+        A node of the SMA* search tree.
+    '''
+    __slots__ = ("f", "kids", "forgotten", "expansions", "token", "position")
+
+    def __init__(self, state, parent, action, cost=0):
+        super().__init__(state, parent, action, cost)
+        self.f = 0
+        self.kids = {} ## Children held in memory, by position in actions()
+        self.forgotten = {} ## Backed-up f of each forgotten child, by position
+        self.expansions = 0
+        self.token = None ## Identifies the node's live frontier entries
+        self.position = None ## Position of its action in the parent's actions()
+
+
+def _sma_star_search(problem, memory_limit, stats):
+    '''
+        Best-first search like A* that holds at most `memory_limit` nodes.
+        When memory is full the worst leaf (highest f, then shallowest) is
+        forgotten and its f kept by its parent, which stays on the frontier
+        with that f so the child is regenerated with it. A node's f is
+        backed up to the lowest f of its children, and the search gives up
+        once every node left has an infinite f. With little memory to spare
+        it regenerates the same nodes many times over, which shows in the
+        reexpansions stat.
+    '''
+    limit = math.inf if memory_limit is None else memory_limit
+    counter = itertools.count()
+    best = [] ## Open nodes by (f, deepest first)
+    worst = [] ## Leaves by (highest f, shallowest first)
+
+    def reopen(node):
+        '''
+            Replaces the node's frontier entries: a leaf is open at its own
+            f, and a node with forgotten children at the lowest of theirs.
+        '''
+        node.token = next(counter)
+        if not node.kids:
+            heapq.heappush(best, (node.f, -node.depth, node.token, node))
+            heapq.heappush(worst, (-node.f, node.depth, node.token, node))
+        elif node.forgotten:
+            f = min(node.forgotten.values())
+            heapq.heappush(best, (f, -node.depth, node.token, node))
+
+    def worst_leaf():
+        '''
+            Returns the leaf to forget next, or None. The root is kept.
+        '''
+        while worst:
+            _, _, token, leaf = worst[0]
+            if token == leaf.token and not leaf.kids and leaf.parent is not None:
+                return leaf
+            heapq.heappop(worst)
+        return None
+
+    def forget(leaf):
+        parent = leaf.parent
+        del parent.kids[leaf.position]
+        parent.forgotten[leaf.position] = leaf.f
+        leaf.token = None
+        reopen(parent)
+
+    def lowest_child_f(node):
+        return min(
+            min((kid.f for kid in node.kids.values()), default=math.inf),
+            min(node.forgotten.values(), default=math.inf)
+        )
+
+    def back_up(node):
+        '''
+            Raises the f of each ancestor of `node` to the lowest f of its
+            children in memory or forgotten.
+        '''
+        parent = node.parent
+        while parent is not None:
+            f = lowest_child_f(parent)
+            if f <= parent.f:
+                return
+            parent.f = f
+            parent = parent.parent
+
+    root = _BoundedNode(problem.initial, None, None)
+    root.f = problem.heuristic(root.state)
+    reopen(root)
+    held = 1
+    stats.peak_frontier = 1
+    while best:
+        f, _, token, node = heapq.heappop(best)
+        if token != node.token:
+            continue
+        if f == math.inf:
+            return None ## Nothing left fits in memory
+        if not node.kids and problem.goal_test(node.state):
+            return node
+        node.token = None
+        stats.nodes_expanded += 1
+        if node.expansions:
+            stats.reexpansions += 1
+        node.expansions += 1
+
+        # Regenerate every child not in memory, with the f it was
+        # forgotten with if it had been generated before
+        on_path = set()
+        ancestor = node.parent
+        while ancestor is not None:
+            on_path.add(ancestor.state)
+            ancestor = ancestor.parent
+        for position, action in enumerate(problem.actions(node.state)):
+            if position in node.kids:
+                continue
+            state = problem.result(node.state, action)
+            if state in on_path:
+                continue
+            cost = node.cost + problem.step_cost(node.state, action, state)
+            child = _BoundedNode(state, node, action, cost)
+            child.position = position
+            stats.nodes_generated += 1
+            if position in node.forgotten:
+                child.f = node.forgotten.pop(position)
+            else:
+                child.f = max(node.f, cost + problem.heuristic(state))
+            if child.depth >= limit:
+                child.f = math.inf ## Its path could never be held
+            elif child.depth == limit - 1 and not problem.goal_test(state):
+                child.f = math.inf ## Its children could never be held
+            if held >= limit:
+                leaf = worst_leaf()
+                if leaf is None or (child.f, -child.depth) > (leaf.f, -leaf.depth):
+                    node.forgotten[position] = child.f ## The child is the worst
+                    continue
+                forget(leaf)
+                held -= 1
+            node.kids[position] = child
+            reopen(child)
+            held += 1
+
+        # A dead end, or a node whose children all cost more, rises to
+        # the lowest f of its children, infinite if it has none
+        node.f = max(node.f, lowest_child_f(node))
+        reopen(node)
+        back_up(node)
+        stats.peak_frontier = max(stats.peak_frontier, held)
+    return None
+
+
+# Strategies holding a bounded number of nodes, each called with the
+# problem, the memory limit and the stats
+MEMORY_BOUNDED_STRATEGIES = {
+    "iddfs": _iterative_deepening_search,
+    "idastar": _ida_star_search,
+    "smastar": _sma_star_search,
+}
+
+
+class MazeProblem(Problem):
+    '''
+        The lecture's text maze: '#' walls, 'A' start, 'B' goal, moved
+        through up, down, left and right with a Manhattan distance heuristic.
+    '''
+
+    def __init__(self, filename):
+        with open(filename) as f:
+            contents = f.read()
+        if contents.count("A") != 1:
+            raise Exception("maze must have exactly one start point")
+        if contents.count("B") != 1:
+            raise Exception("maze must have exactly one goal")
+
+        self.lines = contents.splitlines()
+        self.height = len(self.lines)
+        self.width = max(len(line) for line in self.lines)
+        self.walls = set()
+        for i, line in enumerate(self.lines):
+            for j, char in enumerate(line):
+                if char == "A":
+                    start = (i, j)
+                elif char == "B":
+                    self.goal = (i, j)
+                elif char != " ":
+                    self.walls.add((i, j))
+        super().__init__(start)
+
+    def actions(self, state):
+        row, col = state
+        candidates = [
+            ("up", (row - 1, col)),
+            ("down", (row + 1, col)),
+            ("left", (row, col - 1)),
+            ("right", (row, col + 1))
+        ]
+        return [
+            action for action, (r, c) in candidates
+            if 0 <= r < self.height and 0 <= c < self.width
+            and (r, c) not in self.walls
+        ]
+
+    def result(self, state, action):
+        row, col = state
+        return {
+            "up": (row - 1, col),
+            "down": (row + 1, col),
+            "left": (row, col - 1),
+            "right": (row, col + 1)
+        }[action]
+
+    def goal_test(self, state):
+        return state == self.goal
+
+    def heuristic(self, state):
+        return abs(state[0] - self.goal[0]) + abs(state[1] - self.goal[1])
+
+    def render(self, states=()):
+        '''
+            Returns the maze as text with the given states marked '*'.
+        '''
+        path = set(states) - {self.goal}
+        rows = []
+        for i in range(self.height):
+            row = []
+            for j in range(self.width):
+                if (i, j) in self.walls:
+                    row.append("█")
+                elif (i, j) == self.initial:
+                    row.append("A")
+                elif (i, j) == self.goal:
+                    row.append("B")
+                elif (i, j) in path:
+                    row.append("*")
+                else:
+                    row.append(" ")
+            rows.append("".join(row))
+        return "\n".join(rows)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python Search.py maze.txt [strategy]")
+    maze = MazeProblem(sys.argv[1])
+    node, stats = search(maze, sys.argv[2] if len(sys.argv) == 3 else "astar")
+    if node is None:
+        sys.exit(f"No solution ({stats})")
+    actions, states = node.path()
+    print(maze.render(states))
+    print(f"Steps: {len(actions)}")
+    print(stats)
@@ -0,0 +1,151 @@
+import random
+import time
+
+from Search import Problem, search
+
+# Seconds any one search may take before it is taken to be stuck
+TIMEOUT = 3
+
+
+class TimedOut(Exception):
+    pass
+
+
+def timed_search(problem, strategy, memory_limit=None):
+    '''
+        Runs `search` and raises TimedOut if it tests goals past TIMEOUT.
+    '''
+    deadline = time.monotonic() + TIMEOUT
+    goal_test = problem.goal_test
+
+    def limited_goal_test(state):
+        if time.monotonic() > deadline:
+            raise TimedOut((strategy, memory_limit))
+        return goal_test(state)
+
+    problem.goal_test = limited_goal_test
+    try:
+        return search(problem, strategy, memory_limit)[0]
+    finally:
+        del problem.goal_test
+
+
+class GridProblem(Problem):
+    '''
+        A square grid with walls, from the top-left to the bottom-right corner.
+    '''
+    MOVES = {"up": (-1, 0), "down": (1, 0), "left": (0, -1), "right": (0, 1)}
+
+    def __init__(self, size, walls):
+        super().__init__((0, 0))
+        self.size = size
+        self.walls = walls
+        self.goal = (size - 1, size - 1)
+
+    def actions(self, state):
+        return [
+            action for action in self.MOVES
+            if self._inside(self.result(state, action))
+        ]
+
+    def _inside(self, cell):
+        return (0 <= cell[0] < self.size and 0 <= cell[1] < self.size
+                and cell not in self.walls)
+
+    def result(self, state, action):
+        dr, dc = self.MOVES[action]
+        return (state[0] + dr, state[1] + dc)
+
+    def goal_test(self, state):
+        return state == self.goal
+
+    def heuristic(self, state):
+        return abs(state[0] - self.goal[0]) + abs(state[1] - self.goal[1])
+
+
+class GraphProblem(Problem):
+    '''
+        A directed graph given as {state: [(next_state, step_cost), ...]}.
+    '''
+
+    def __init__(self, edges, initial, goal):
+        super().__init__(initial)
+        self.edges = edges
+        self.goal = goal
+
+    def actions(self, state):
+        return list(range(len(self.edges.get(state, []))))
+
+    def result(self, state, action):
+        return self.edges[state][action][0]
+
+    def step_cost(self, state, action, result):
+        return self.edges[state][action][1]
+
+    def goal_test(self, state):
+        return state == self.goal
+
+
+def check_sma_star(problem, optimal, limits):
+    '''
+        Checks SMA* against an optimal solution under each memory limit:
+        the same cost when the solution fits, and otherwise None or a
+        costlier solution that did fit.
+    '''
+    for memory_limit in limits:
+        node = timed_search(problem, "smastar", memory_limit)
+        if optimal is None:
+            assert node is None, memory_limit
+        elif memory_limit > optimal.depth:
+            assert node is not None, memory_limit
+            assert node.cost == optimal.cost, memory_limit
+        elif node is not None:
+            assert node.cost >= optimal.cost, memory_limit
+            assert node.depth < memory_limit, memory_limit
+
+
+def test_sma_star_matches_a_star_when_the_solution_fits():
+    solved = 0
+    for seed in range(60):
+        rng = random.Random(seed)
+        size = rng.randint(3, 6)
+        walls = {
+            (r, c) for r in range(size) for c in range(size)
+            if rng.random() < 0.3
+        } - {(0, 0), (size - 1, size - 1)}
+        problem = GridProblem(size, walls)
+        optimal, _ = search(problem, "astar")
+        if optimal is None:
+            continue
+        solved += 1
+        check_sma_star(problem, optimal, range(1, optimal.depth + 8))
+    assert solved
+
+
+def test_sma_star_on_a_weighted_graph_with_equal_f_ties():
+    edges = {
+        0: [(1, 4), (3, 4), (6, 5)], 1: [(2, 3), (3, 2), (6, 3)],
+        2: [(4, 2)], 3: [(0, 1), (1, 2), (4, 3), (6, 5)],
+        4: [(3, 5), (5, 2)], 5: [(0, 1)], 6: [(0, 5), (3, 1)]
+    }
+    problem = GraphProblem(edges, 0, 6)
+    assert timed_search(problem, "smastar", 1) is None
+    for memory_limit in range(2, 11):
+        assert timed_search(problem, "smastar", memory_limit).cost == 5
+
+
+def test_sma_star_matches_uniform_cost_on_weighted_graphs():
+    for seed in range(100):
+        rng = random.Random(seed)
+        size = rng.randint(4, 10)
+        edges = {
+            state: [
+                (neighbor, rng.randint(1, 6))
+                for neighbor in rng.sample(range(size), rng.randint(1, 4))
+            ]
+            for state in range(size)
+        }
+        problem = GraphProblem(edges, 0, size - 1)
+        optimal = timed_search(problem, "ucs")
+        depth = optimal.depth if optimal is not None else 0
+        check_sma_star(problem, optimal, range(1, depth + 8))
@@ -0,0 +1,127 @@
+"""
+Benchmark runner for degrees.
+
+Times load_data, measures the process's peak RSS, and reports p50/p99
+shortest_path latency over random pairs of people, as JSON. Run each
+configuration in a fresh process so peak RSS reflects that one backend.
+
+Usage: python benchmark.py [--compact] [--fresh] [--processes N]
+                           [--landmarks K] [--pairs N] [--seed N]
+                           [--output FILE] directory
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+
+import degrees
+from graph import SNAPSHOT_NAME
+from loadtest import percentile
+
+
+def peak_rss_bytes():
+    """
+    Returns the peak resident set size of this process in bytes.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def git_revision():
+    """
+    Returns the current git commit, or None outside a git checkout.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+            check=True, cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(directory, compact=False, fresh=False, processes=1, landmarks=0,
+        pairs=1000, seed=0):
+    """
+    Returns a dictionary of benchmark results for one configuration.
+    """
+    if fresh:
+        for name in os.listdir(directory):
+            if name.endswith(".snapshot"):
+                os.remove(os.path.join(directory, name))
+    snapshot = os.path.exists(os.path.join(directory, SNAPSHOT_NAME))
+
+    start = time.perf_counter()
+    degrees.load_data(directory, compact=compact, landmarks=landmarks,
+                      processes=processes)
+    load_seconds = time.perf_counter() - start
+    rss_after_load = peak_rss_bytes()
+
+    rng = random.Random(seed)
+    person_ids = list(degrees.people)
+    latencies = []
+    lengths = []
+    for _ in range(pairs):
+        source, target = rng.choice(person_ids), rng.choice(person_ids)
+        start = time.perf_counter()
+        path = degrees.shortest_path(source, target)
+        latencies.append((time.perf_counter() - start) * 1000)
+        lengths.append(None if path is None else len(path))
+    connected = [length for length in lengths if length is not None]
+
+    return {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "directory": directory,
+        "backend": "compact" if compact else "dict",
+        "snapshot_used": compact and snapshot and not fresh,
+        "processes": processes,
+        "landmarks": landmarks,
+        "dataset": degrees.dataset_stats(),
+        "load_seconds": load_seconds,
+        "peak_rss_after_load_bytes": rss_after_load,
+        "peak_rss_bytes": peak_rss_bytes(),
+        "queries": pairs,
+        "connected_queries": len(connected),
+        "mean_degrees": sum(connected) / len(connected) if connected else None,
+        "latency_ms": {
+            "p50": percentile(latencies, 0.50),
+            "p99": percentile(latencies, 0.99),
+            "max": max(latencies)
+        } if latencies else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark degrees.")
+    parser.add_argument("directory")
+    parser.add_argument("--compact", action="store_true",
+                        help="use the compact graph backend")
+    parser.add_argument("--fresh", action="store_true",
+                        help="delete snapshots first so the CSVs are parsed")
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--landmarks", type=int, default=0)
+    parser.add_argument("--pairs", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    results = run(args.directory, args.compact, args.fresh, args.processes,
+                  args.landmarks, args.pairs, args.seed)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Micro-benchmark for the frontier classes in util.py.
+
+Fills each frontier with n nodes, checking membership before every add
+the way shortest_path does, then drains it. The original list-based
+frontiers are timed alongside for comparison, up to NAIVE_LIMIT nodes,
+since they grow quadratically.
+
+Usage: python benchmark_frontier.py [max_exponent]
+"""
+
+import sys
+import time
+
+from util import Node, StackFrontier, QueueFrontier, PriorityFrontier
+
+NAIVE_LIMIT = 10 ** 4
+
+
+class ListStackFrontier():
+    def __init__(self):
+        self.frontier = []
+
+    def add(self, node):
+        self.frontier.append(node)
+
+    def contains_state(self, state):
+        return any(node.state == state for node in self.frontier)
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        node = self.frontier[-1]
+        self.frontier = self.frontier[:-1]
+        return node
+
+
+class ListQueueFrontier(ListStackFrontier):
+
+    def remove(self):
+        node = self.frontier[0]
+        self.frontier = self.frontier[1:]
+        return node
+
+
+def run(frontier_class, n):
+    """
+    Returns the seconds taken to fill and drain a frontier of n nodes.
+    """
+    start = time.perf_counter()
+    frontier = frontier_class()
+    for state in range(n):
+        if not frontier.contains_state(state):
+            frontier.add(Node(state=state, parent=None, action=None))
+    while not frontier.empty():
+        frontier.remove()
+    return time.perf_counter() - start
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python benchmark_frontier.py [max_exponent]")
+    max_exponent = int(sys.argv[1]) if len(sys.argv) == 2 else 6
+
+    classes = [
+        ("StackFrontier", StackFrontier, None),
+        ("QueueFrontier", QueueFrontier, None),
+        ("PriorityFrontier", PriorityFrontier, None),
+        ("list StackFrontier", ListStackFrontier, NAIVE_LIMIT),
+        ("list QueueFrontier", ListQueueFrontier, NAIVE_LIMIT),
+    ]
+
+    print(f"{'frontier':<20}" + "".join(
+        f"{f'10^{e}':>12}" for e in range(3, max_exponent + 1)
+    ))
+    for label, frontier_class, limit in classes:
+        row = f"{label:<20}"
+        for exponent in range(3, max_exponent + 1):
+            n = 10 ** exponent
+            if limit is not None and n > limit:
+                row += f"{'-':>12}"
+            else:
+                row += f"{run(frontier_class, n):>11.4f}s"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Command-line client for the degrees query server.
+
+Usage: python client.py [--host HOST] [--port PORT] source target
+"""
+
+import argparse
+import json
+import socket
+import sys
+
+from server import DEFAULT_HOST, DEFAULT_PORT
+
+
+class Client():
+    """
+    Sends queries to a running server over one connection.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.socket = socket.create_connection((host, port))
+        self.reader = self.socket.makefile("rb")
+        self.next_id = 0
+
+    def query(self, source, target):
+        """
+        Returns the server's response dictionary for one pair.
+        """
+        self.next_id += 1
+        request = {"id": self.next_id, "source": source, "target": target}
+        self.socket.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        return json.loads(self.reader.readline())
+
+    def close(self):
+        self.reader.close()
+        self.socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query a degrees server.")
+    parser.add_argument("source")
+    parser.add_argument("target")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    with Client(args.host, args.port) as client:
+        response = client.query(args.source, args.target)
+
+    if "error" in response:
+        sys.exit(response["error"])
+    if response["path"] is None:
+        print("Not connected.")
+    else:
+        print(f"{response['degrees']} degrees of separation.")
+        person = response["source"]["name"]
+        for i, step in enumerate(response["path"]):
+            print(f"{i + 1}: {person} and {step['name']} starred in {step['title']}")
+            person = step["name"]
+    print(f"({response['elapsed_ms']:.2f} ms)")
+
+
+if __name__ == "__main__":
+    main()
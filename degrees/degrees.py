@@ -1,6 +1,20 @@
 import csv
+import errno
+import functools
+import os
 import sys
 
+from graph import (
+    CompactGraph, bidirectional_bfs, count_labels, label_components,
+    merge_labels, parse_year, resolve_label
+)
+from landmarks import LandmarkOracle
+from loader import load_parallel
+from nameindex import NameIndex
+from paths import (
+    ShortestPathDAG, all_shortest_paths as dag_all_shortest_paths,
+    k_shortest_paths as yen_k_shortest_paths
+)
 from util import Node, StackFrontier, QueueFrontier
 
 # Maps names to a set of corresponding person_ids
@@ -12,11 +26,63 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Sorted NameIndex over all people, for prefix and fuzzy lookups
+name_index = None
 
-def load_data(directory):
+# Maps person_ids to the number of their connected component
+components = {}
+
+# Number of people in each connected component
+component_sizes = []
+
+# Maps component numbers merged by apply_delta to the one they joined
+component_alias = {}
+
+# CompactGraph backing the three maps above when loaded with compact=True
+graph = None
+
+# LandmarkOracle over the compact graph, when loaded with landmarks
+oracle = None
+
+
+def load_data(directory, compact=False, landmarks=0, processes=1):
     """
     Load data from CSV files into memory.
+
+    With `compact`, the data is held in an integer-indexed CSR graph
+    and `names`, `people` and `movies` become read-only views onto it.
+    The graph is cached in a binary snapshot next to the CSV files and
+    memory-mapped on later loads, until any of the CSV files change.
+
+    With `landmarks`, a compact graph also loads (or builds and saves)
+    BFS distances from that many landmark people, which bound degrees
+    of separation and can guide `shortest_path`.
+
+    With `processes` other than 1, a compact graph that has to be read
+    from the CSV files is parsed in chunks by that many worker
+    processes, or one per core when None.
     """
+    global graph, oracle, names, people, movies, name_index
+    global components, component_sizes, component_alias
+    oracle = None
+    component_alias = {}
+    if compact:
+        parse = None
+        if processes != 1:
+            parse = functools.partial(load_parallel, processes=processes)
+        graph = CompactGraph.load(directory, parse=parse)
+        if landmarks:
+            oracle = LandmarkOracle.load(graph, directory, landmarks)
+        names = graph.names_view()
+        people = graph.people_view()
+        movies = graph.movies_view()
+        name_index = NameIndex.from_graph(graph)
+        components, component_sizes = {}, []
+        return
+    if graph is not None:
+        graph = None
+        names, people, movies = {}, {}, {}
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
@@ -51,17 +117,33 @@ def load_data(directory):
             except KeyError:
                 pass
 
+    # Label connected components so disconnected pairs are rejected at once
+    person_ids = list(people)
+    index = {person_id: i for i, person_id in enumerate(person_ids)}
+    labels = label_components(len(person_ids), (
+        [index[person_id] for person_id in movie["stars"]]
+        for movie in movies.values()
+    ))
+    components = dict(zip(person_ids, labels))
+    component_sizes = list(count_labels(labels))
+
+    name_index = NameIndex.from_people(people)
+
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    args = sys.argv[1:]
+    compact = "--compact" in args
+    if compact:
+        args.remove("--compact")
+    if len(args) > 1:
+        sys.exit("Usage: python degrees.py [--compact] [directory]")
+    directory = args[0] if len(args) == 1 else "large"
 
     print(directory)
     # directory = "degrees\large"
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    load_data(directory, compact=compact)
     print("Data loaded.")
 
     source = person_id_for_name(input("Name: "))
@@ -86,9 +168,49 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, bidirectional=True, guided=False,
+                  constraints=None):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target.
+
+    If no possible path, returns None.
+
+    By default the search grows frontiers from both ends; pass
+    `bidirectional=False` to run the one-sided BFS instead, or
+    `guided=True` to run A* on the landmark oracle's lower bounds.
+    `constraints`, a graph.Constraints, limits the movies and people
+    the path may use.
+    """
+    if not may_be_connected(source, target):
+        return None
+    if guided:
+        if oracle is None:
+            raise RuntimeError("guided search needs load_data(landmarks=...)")
+        search = oracle.search
+        if constraints is not None:
+            neighbors = graph.constrained_neighbors(constraints)
+            search = lambda s, t: oracle.search(s, t, neighbors)
+        return graph.shortest_path(source, target, search, constraints)
+    if graph is not None and bidirectional:
+        return graph.shortest_path(source, target, constraints=constraints)
+
+    neighbors = neighbors_for_person
+    if constraints is not None:
+        if not constraints.allows_endpoints(source, target):
+            return None
+        neighbors = constrained_neighbors(constraints)
+    if bidirectional:
+        return bidirectional_bfs(source, target, neighbors)
+    return breadth_first_search(source, target, neighbors)
+
+
+def breadth_first_search(source, target, neighbors_of=None):
     # Since this problem relies on connections, I believe BFS is the best approach since the problem needs an optimal solution
 
+    if neighbors_of is None:
+        neighbors_of = neighbors_for_person
+
     # Create the frontier and initial node to explore
     frontier = QueueFrontier()
     root = Node(state=source, parent=None, action=None)
@@ -120,7 +242,7 @@ def shortest_path(source, target):
             return actions
         
         # Create all child nodes, with state = ActorID, parent = currNode and action = Movie
-        neighbors = neighbors_for_person(currNode.state)
+        neighbors = neighbors_of(currNode.state)
 
         # Create loop to add all pairs
         for movie, actor in neighbors:
@@ -129,8 +251,239 @@ def shortest_path(source, target):
                 # Create node for actor and add
                 child = Node(state=actor, parent=currNode, action=movie)
                 frontier.add(child)
-        
-    raise NotImplementedError
+
+
+def bidirectional_search(source, target):
+    """
+    Breadth-first search grown from both the source and the target,
+    always expanding one full layer of whichever frontier is smaller.
+
+    Returns the same list of (movie_id, person_id) pairs as
+    `breadth_first_search`, or None if the two are not connected.
+    """
+    return bidirectional_bfs(source, target, neighbors_for_person)
+
+
+def _search_space(source, target, constraints=None):
+    """
+    Returns (source, target, neighbors, translate) for searching the
+    loaded backend: the endpoints and neighbors function it searches on,
+    and a function turning its paths into (movie_id, person_id) pairs.
+    """
+    if graph is None:
+        neighbors = neighbors_for_person
+        if constraints is not None:
+            neighbors = constrained_neighbors(constraints)
+        return source, target, neighbors, list
+
+    neighbors = graph.neighbors
+    if constraints is not None:
+        neighbors = graph.constrained_neighbors(constraints)
+    movie_ids, person_ids = graph.movie_ids, graph.person_ids
+
+    def translate(path):
+        return [(movie_ids[m], person_ids[p]) for m, p in path]
+
+    index = graph.person_index
+    return index[source], index[target], neighbors, translate
+
+
+def shortest_path_dag(source, target, constraints=None):
+    """
+    Returns a paths.ShortestPathDAG of every shortest connection between
+    two people, searched on the loaded backend, or None if not connected.
+    Its `count()` gives the number of shortest paths without listing them.
+    """
+    if not may_be_connected(source, target):
+        return None
+    if constraints is not None and not constraints.allows_endpoints(source, target):
+        return None
+    source, target, neighbors, _ = _search_space(source, target, constraints)
+    return ShortestPathDAG.build(source, target, neighbors)
+
+
+def all_shortest_paths(source, target, limit=None, timeout=None,
+                       constraints=None):
+    """
+    Yields every shortest list of (movie_id, person_id) pairs connecting
+    the source to the target, lazily, stopping after `limit` paths or
+    `timeout` seconds.
+    """
+    if not may_be_connected(source, target):
+        return
+    if constraints is not None and not constraints.allows_endpoints(source, target):
+        return
+    source, target, neighbors, translate = _search_space(
+        source, target, constraints
+    )
+    for path in dag_all_shortest_paths(source, target, neighbors, limit, timeout):
+        yield translate(path)
+
+
+def k_shortest_paths(source, target, k, timeout=None, constraints=None):
+    """
+    Yields up to `k` loopless lists of (movie_id, person_id) pairs
+    connecting the source to the target, shortest first.
+    """
+    if not may_be_connected(source, target):
+        return
+    if constraints is not None and not constraints.allows_endpoints(source, target):
+        return
+    source, target, neighbors, translate = _search_space(
+        source, target, constraints
+    )
+    for path in yen_k_shortest_paths(source, target, neighbors, k, timeout):
+        yield translate(path)
+
+
+def read_delta(directory):
+    """
+    Returns the (people, movies, stars) rows of a delta directory holding
+    any of people.csv, movies.csv and stars.csv, as lists of dictionaries.
+    Raises FileNotFoundError if the directory does not exist, so a
+    mistyped path is not taken for an empty delta.
+    """
+    if not os.path.isdir(directory):
+        raise FileNotFoundError(
+            errno.ENOENT, "No such delta directory", directory
+        )
+    rows = []
+    for filename in ["people.csv", "movies.csv", "stars.csv"]:
+        path = os.path.join(directory, filename)
+        if not os.path.exists(path):
+            rows.append([])
+            continue
+        with open(path, encoding="utf-8") as f:
+            rows.append(list(csv.DictReader(f)))
+    return tuple(rows)
+
+
+def apply_delta(people_rows, movie_rows, star_rows):
+    """
+    Adds people, movies and stars rows to the loaded data in place,
+    keeping names, components and the name index consistent.
+    Rows for ids already loaded are skipped.
+
+    Returns the number of people, movies and stars added.
+    """
+    global oracle
+    if graph is not None:
+        added_people, added_movies, added_stars = graph.apply_delta(
+            people_rows, movie_rows, star_rows
+        )
+        for person in added_people:
+            name_index.add(graph.person_names[person], graph.person_ids[person])
+        # Landmark distances do not cover the new people and stars
+        if added_people or added_stars:
+            oracle = None
+        return {
+            "people": len(added_people),
+            "movies": len(added_movies),
+            "stars": len(added_stars)
+        }
+
+    added = {"people": 0, "movies": 0, "stars": 0}
+    for row in people_rows:
+        if row["id"] in people:
+            continue
+        people[row["id"]] = {
+            "name": row["name"],
+            "birth": row["birth"],
+            "movies": set()
+        }
+        names.setdefault(row["name"].lower(), set()).add(row["id"])
+        components[row["id"]] = len(component_sizes)
+        component_sizes.append(1)
+        if name_index is not None:
+            name_index.add(row["name"], row["id"])
+        added["people"] += 1
+
+    for row in movie_rows:
+        if row["id"] in movies:
+            continue
+        movies[row["id"]] = {
+            "title": row["title"],
+            "year": row["year"],
+            "stars": set()
+        }
+        added["movies"] += 1
+
+    for row in star_rows:
+        person_id, movie_id = row["person_id"], row["movie_id"]
+        if person_id not in people or movie_id not in movies:
+            continue
+        stars = movies[movie_id]["stars"]
+        if person_id in stars:
+            continue
+        if stars:
+            first, second = component_of(next(iter(stars))), component_of(person_id)
+            if first is not None and second is not None:
+                merge_labels(component_alias, component_sizes, first, second)
+        stars.add(person_id)
+        people[person_id]["movies"].add(movie_id)
+        added["stars"] += 1
+    return added
+
+
+def apply_updates(directory):
+    """
+    Applies the delta CSV files in `directory` without reloading,
+    and returns the number of people, movies and stars added.
+    """
+    return apply_delta(*read_delta(directory))
+
+
+def component_of(person_id):
+    """
+    Returns the number of the connected component a person belongs to,
+    or None if components have not been labelled for them.
+    """
+    if graph is not None:
+        return graph.component(graph.person_index[person_id])
+    label = components.get(person_id)
+    if label is None:
+        return None
+    return resolve_label(component_alias, label)
+
+
+def may_be_connected(source, target):
+    """
+    Returns False if the component index shows the two people
+    cannot be connected, and True otherwise.
+    """
+    source_component = component_of(source)
+    if source_component is None:
+        return True
+    return source_component == component_of(target)
+
+
+def separation_bounds(source, target):
+    """
+    Returns (lower, upper) bounds on the degrees of separation between
+    two people from the landmark oracle, without searching. `upper` is
+    None when unknown. Returns None if the two are not connected.
+    """
+    if oracle is None:
+        raise RuntimeError("separation bounds need load_data(landmarks=...)")
+    index = graph.person_index
+    return oracle.bounds(index[source], index[target])
+
+
+def dataset_stats():
+    """
+    Returns counts of people, movies and connected components,
+    with the sizes of the largest components.
+    """
+    sizes = graph.component_sizes if graph is not None else component_sizes
+    # Components merged by updates are left behind with a size of 0
+    sizes = [size for size in sizes if size]
+    return {
+        "people": len(people),
+        "movies": len(movies),
+        "components": len(sizes),
+        "largest_components": sorted(sizes, reverse=True)[:10],
+        "isolated_people": sum(1 for size in sizes if size == 1)
+    }
 
 
 def person_id_for_name(name):
@@ -138,7 +491,7 @@ def person_id_for_name(name):
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    person_ids = person_ids_for_name(name)
     if len(person_ids) == 0:
         return None
     elif len(person_ids) > 1:
@@ -159,11 +512,57 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def person_ids_for_name(name, birth=None):
+    """
+    Returns the IMDB ids of everyone with a given name, ignoring case,
+    optionally narrowed to those born in the year `birth`.
+    Never prompts, so it is safe for batch and server callers.
+    """
+    if name_index is not None:
+        person_ids = name_index.exact(name)
+    else:
+        person_ids = sorted(names.get(name.lower(), set()))
+    if birth is not None:
+        person_ids = [
+            person_id for person_id in person_ids
+            if people[person_id]["birth"] == str(birth)
+        ]
+    return person_ids
+
+
+def constrained_neighbors(constraints):
+    """
+    Returns a function like `neighbors_for_person` that only returns
+    pairs allowed by `constraints`, a graph.Constraints.
+    """
+    def neighbors(person_id):
+        pairs = set()
+        for movie_id in people[person_id]["movies"]:
+            movie = movies[movie_id]
+            stars = movie["stars"]
+            if not constraints.allows_movie(
+                movie_id, parse_year(movie["year"]), len(stars)
+            ):
+                continue
+            for star_id in stars:
+                if star_id not in constraints.exclude_people:
+                    pairs.add((movie_id, star_id))
+        return pairs
+
+    return neighbors
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
+    if graph is not None:
+        movie_ids, person_ids = graph.movie_ids, graph.person_ids
+        return {
+            (movie_ids[movie], person_ids[person])
+            for movie, person in graph.neighbors(graph.person_index[person_id])
+        }
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
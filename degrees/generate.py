@@ -0,0 +1,111 @@
+"""
+Synthetic scale-free dataset generator for degrees.
+
+Writes people.csv, movies.csv and stars.csv in the same format as the
+IMDB extracts. Cast sizes follow a Pareto distribution, and half of all
+casting picks people by Zipf-weighted popularity while the rest is
+uniform, so a few prolific actors appear in many movies while most appear
+in one or two, as in the real data.
+
+Usage: python generate.py [--stars N] [--seed N] directory
+"""
+
+import argparse
+import csv
+import itertools
+import os
+import random
+
+FIRST_NAMES = [
+    "Alex", "Ana", "Ben", "Carla", "Chen", "Dana", "Elena", "Femi", "Grace",
+    "Hiro", "Ines", "Jack", "Kofi", "Lena", "Marco", "Nadia", "Omar", "Priya",
+    "Quinn", "Rosa", "Sam", "Tara", "Umar", "Vera", "Wei", "Yara", "Zoe"
+]
+
+LAST_NAMES = [
+    "Adams", "Bauer", "Costa", "Diaz", "Evans", "Fischer", "Garcia", "Hughes",
+    "Ito", "Jensen", "Kim", "Lopez", "Moreau", "Novak", "Okafor", "Park",
+    "Quist", "Rossi", "Silva", "Tanaka", "Ueda", "Varga", "Walsh", "Xu",
+    "Young", "Zhang"
+]
+
+# Average number of credits per person and the cast size parameters
+CREDITS_PER_PERSON = 3
+POPULAR_FRACTION = 0.5
+PARETO_ALPHA = 1.6
+MAX_CAST = 200
+
+
+def cast_size(rng):
+    """
+    Returns a Pareto-distributed cast size of at least 1.
+    """
+    return min(MAX_CAST, int(rng.paretovariate(PARETO_ALPHA)))
+
+
+def generate(directory, stars, seed=0):
+    """
+    Writes a dataset with about `stars` star rows to `directory`
+    and returns the (people, movies, stars) row counts.
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+
+    # Zipf popularity: person i is cast with weight 1 / (i + 1)
+    person_count = max(1, stars // CREDITS_PER_PERSON)
+    cumulative = list(itertools.accumulate(
+        1 / (i + 1) for i in range(person_count)
+    ))
+
+    with open(f"{directory}/people.csv", "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "birth"])
+        for i in range(person_count):
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            birth = rng.randint(1920, 2010) if rng.random() < 0.8 else ""
+            writer.writerow([i + 1, name, birth])
+
+    star_rows = 0
+    movie_count = 0
+    with open(f"{directory}/movies.csv", "w", encoding="utf-8", newline="") as m, \
+            open(f"{directory}/stars.csv", "w", encoding="utf-8", newline="") as s:
+        movie_writer = csv.writer(m)
+        star_writer = csv.writer(s)
+        movie_writer.writerow(["id", "title", "year"])
+        star_writer.writerow(["person_id", "movie_id"])
+        while star_rows < stars:
+            movie_count += 1
+            movie_writer.writerow([
+                movie_count, f"Movie {movie_count}", rng.randint(1930, 2024)
+            ])
+            size = min(cast_size(rng), stars - star_rows, person_count)
+            cast = set()
+            while len(cast) < size:
+                if rng.random() < POPULAR_FRACTION:
+                    cast.update(rng.choices(
+                        range(person_count), cum_weights=cumulative
+                    ))
+                else:
+                    cast.add(rng.randrange(person_count))
+            for person in cast:
+                star_writer.writerow([person + 1, movie_count])
+            star_rows += len(cast)
+
+    return person_count, movie_count, star_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a degrees dataset.")
+    parser.add_argument("directory")
+    parser.add_argument("--stars", type=int, default=10 ** 5,
+                        help="number of star rows, from 10^4 to 10^7")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    people, movies, stars = generate(args.directory, args.stars, args.seed)
+    print(f"Wrote {people:,} people, {movies:,} movies and {stars:,} stars "
+          f"to {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
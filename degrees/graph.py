@@ -0,0 +1,949 @@
+"""
+Compact graph backend for degrees.
+
+IMDB ids are interned to dense ints and the person-movie adjacency is
+stored in both directions as CSR (compressed sparse row) arrays: the
+movies of person i are person_movies[person_offsets[i]:person_offsets[i + 1]]
+and the people of movie j are movie_people[movie_offsets[j]:movie_offsets[j + 1]].
+Searches run entirely on ints and only translate back to ids at output.
+"""
+
+import bisect
+import csv
+import heapq
+import os
+from array import array
+from collections.abc import Mapping, Sequence
+
+from snapshot import read_snapshot, source_stamp, write_snapshot
+
+# Snapshot file written next to the CSV files by CompactGraph.load
+SNAPSHOT_NAME = "degrees.snapshot"
+
+# Source files a snapshot is keyed on
+CSV_FILES = ["people.csv", "movies.csv", "stars.csv"]
+
+
+def build_csr(count, sources, targets):
+    """
+    Returns (offsets, indices) arrays for `count` rows, given parallel
+    arrays of edge sources and targets, using a counting sort.
+    """
+    offsets = array("i", bytes(4 * (count + 1)))
+    for source in sources:
+        offsets[source + 1] += 1
+    for i in range(count):
+        offsets[i + 1] += offsets[i]
+
+    position = array("i", offsets)
+    indices = array("i", bytes(4 * len(targets)))
+    for source, target in zip(sources, targets):
+        indices[position[source]] = target
+        position[source] += 1
+    return offsets, indices
+
+
+def label_components(count, groups):
+    """
+    Returns an array labelling each of `count` items with the number of
+    its connected component, numbered densely from 0, where the items of
+    each group in `groups` are connected to one another.
+    """
+    parent = array("i", range(count))
+
+    def find(item):
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    for group in groups:
+        root = None
+        for item in group:
+            if root is None:
+                root = find(item)
+                continue
+            other = find(item)
+            if other != root:
+                parent[other] = root
+
+    labels = array("i", bytes(4 * count))
+    numbers = {}
+    for item in range(count):
+        labels[item] = numbers.setdefault(find(item), len(numbers))
+    return labels
+
+
+def resolve_label(alias, label):
+    """
+    Follows `alias` from a component label to its current label.
+    """
+    while label in alias:
+        label = alias[label]
+    return label
+
+
+def merge_labels(alias, sizes, first, second):
+    """
+    Merges two current component labels, aliasing the smaller component
+    to the larger and moving its size across.
+    """
+    if first == second:
+        return
+    if sizes[first] < sizes[second]:
+        first, second = second, first
+    alias[second] = first
+    sizes[first] += sizes[second]
+    sizes[second] = 0
+
+
+def count_labels(labels):
+    """
+    Returns an array of how many items carry each label.
+    """
+    counts = array("i", bytes(4 * (max(labels) + 1 if labels else 0)))
+    for label in labels:
+        counts[label] += 1
+    return counts
+
+
+class Constraints():
+    """
+    Restrictions on the movies and people a path may pass through:
+    an inclusive year range, a maximum cast size, and sets of
+    excluded movie_ids and person_ids.
+    """
+
+    def __init__(self, min_year=None, max_year=None, max_cast=None,
+                 exclude_movies=(), exclude_people=()):
+        self.min_year = min_year
+        self.max_year = max_year
+        self.max_cast = max_cast
+        self.exclude_movies = set(exclude_movies)
+        self.exclude_people = set(exclude_people)
+
+    def allows_movie(self, movie_id, year, cast):
+        """
+        Returns True if a movie with this id, year and cast size may be used.
+        """
+        if self.min_year is not None and year < self.min_year:
+            return False
+        if self.max_year is not None and year > self.max_year:
+            return False
+        if self.max_cast is not None and cast > self.max_cast:
+            return False
+        return movie_id not in self.exclude_movies
+
+    def allows_endpoints(self, source, target):
+        """
+        Returns True unless the source or target person_id is excluded.
+        """
+        return (source not in self.exclude_people
+                and target not in self.exclude_people)
+
+
+def parse_year(value):
+    """
+    Returns a CSV birth or year field as an int, 0 when unknown.
+    """
+    try:
+        return int(value)
+    except ValueError:
+        return 0
+
+
+class StringTable(Sequence):
+    """
+    Sequence of strings packed into one UTF-8 blob, with the bytes of
+    string i at blob[offsets[i]:offsets[i + 1]]. Strings appended later
+    are kept in a plain list after the packed ones.
+    """
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+        self.extra = []
+
+    @classmethod
+    def from_strings(cls, strings):
+        encoded = [s.encode("utf-8") for s in strings]
+        offsets = array("q", [0])
+        total = 0
+        for value in encoded:
+            total += len(value)
+            offsets.append(total)
+        return cls(b"".join(encoded), offsets)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        packed = len(self.offsets) - 1
+        if i >= packed:
+            return self.extra[i - packed]
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    def __len__(self):
+        return len(self.offsets) - 1 + len(self.extra)
+
+    def append(self, value):
+        self.extra.append(value)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+class SortedIndex():
+    """
+    Looks up positions in a StringTable by value through a permutation
+    of the table sorted by value (lowercased when `lower` is set).
+    Positions added later are kept in a dictionary beside the permutation.
+    """
+
+    def __init__(self, table, order, lower=False):
+        self.table = table
+        self.order = order
+        self.lower = lower
+        self.extra = {}
+
+    @classmethod
+    def build(cls, strings, table, lower=False):
+        if lower:
+            keys = [s.lower() for s in strings]
+        else:
+            keys = strings
+        order = array("i", sorted(range(len(keys)), key=keys.__getitem__))
+        return cls(table, order, lower)
+
+    def key(self, i):
+        """
+        Returns the sort key of table position i.
+        """
+        value = self.table[i]
+        return value.lower() if self.lower else value
+
+    def span(self, key):
+        """
+        Returns the (start, end) range of `order` holding `key`.
+        """
+        start = bisect.bisect_left(self.order, key, key=self.key)
+        end = bisect.bisect_right(self.order, key, lo=start, key=self.key)
+        return start, end
+
+    def find(self, key):
+        """
+        Returns the table positions whose key equals `key`, in table order.
+        """
+        start, end = self.span(key)
+        return list(self.order[start:end]) + self.extra.get(key, [])
+
+    def get(self, key, default=None):
+        positions = self.find(key)
+        return positions[0] if positions else default
+
+    def __getitem__(self, key):
+        positions = self.find(key)
+        if not positions:
+            raise KeyError(key)
+        return positions[0]
+
+    def __contains__(self, key):
+        start, end = self.span(key)
+        return start < end or key in self.extra
+
+    def lookup(self, keys):
+        """
+        Returns a dictionary mapping each of `keys` to the position `get`
+        would return for it, or None. Resolving a batch this way decodes
+        each probed key once for the whole batch, since every search
+        starts from the same midpoints.
+        """
+        order, table, lower = self.order, self.table, self.lower
+        blob, offsets = table.blob, table.offsets
+        probed = {}
+        found = {}
+        for key in set(keys):
+            lo, hi = 0, len(order)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                value = probed.get(mid)
+                if value is None:
+                    i = order[mid]
+                    value = str(blob[offsets[i]:offsets[i + 1]], "utf-8")
+                    if lower:
+                        value = value.lower()
+                    probed[mid] = value
+                if value < key:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            # The search ends on the leftmost key not below `key`, which
+            # was always probed on the way unless past the end
+            if lo < len(order) and probed.get(lo) == key:
+                found[key] = order[lo]
+            elif key in self.extra:
+                found[key] = self.extra[key][0]
+            else:
+                found[key] = None
+        return found
+
+    def add(self, value, i):
+        """
+        Records that table position i holds `value`.
+        """
+        key = value.lower() if self.lower else value
+        self.extra.setdefault(key, []).append(i)
+
+    def keys(self):
+        """
+        Yields each distinct key once, in sorted order.
+        """
+        previous = None
+        for key in heapq.merge(map(self.key, self.order), sorted(self.extra)):
+            if key != previous:
+                yield key
+                previous = key
+
+
+class CompactGraph():
+    """
+    Person-movie graph with IMDB ids interned to dense ints.
+    """
+
+    # Flat array attributes saved to and loaded from snapshots
+    ARRAYS = {
+        "person_births": "h",
+        "movie_years": "h",
+        "person_offsets": "i",
+        "person_movies": "i",
+        "movie_offsets": "i",
+        "movie_people": "i",
+        "person_id_order": "i",
+        "movie_id_order": "i",
+        "name_order": "i",
+        "person_components": "i",
+        "component_sizes": "i"
+    }
+
+    # StringTable attributes saved to and loaded from snapshots
+    TABLES = ["person_ids", "person_names", "movie_ids", "movie_titles"]
+
+    # Bumped whenever the meaning of a saved array changes
+    SNAPSHOT_VERSION = 1
+
+    def __init__(self, person_ids, person_names, person_births,
+                 movie_ids, movie_titles, movie_years,
+                 person_offsets, person_movies, movie_offsets, movie_people,
+                 person_id_order, movie_id_order, name_order,
+                 person_components, component_sizes):
+        self.person_ids = person_ids
+        self.person_names = person_names
+        self.person_births = person_births
+        self.movie_ids = movie_ids
+        self.movie_titles = movie_titles
+        self.movie_years = movie_years
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+        self.person_id_order = person_id_order
+        self.movie_id_order = movie_id_order
+        self.name_order = name_order
+        self.person_components = person_components
+        self.component_sizes = component_sizes
+
+        self.person_index = SortedIndex(person_ids, person_id_order)
+        self.movie_index = SortedIndex(movie_ids, movie_id_order)
+        self.name_index = SortedIndex(person_names, name_order, lower=True)
+
+        # Credits added by apply_delta on top of the CSR arrays
+        self.extra_person_movies = {}
+        self.extra_movie_people = {}
+
+        # Component labels merged by apply_delta, mapped to the label
+        # of the component they joined
+        self.component_alias = {}
+
+    @classmethod
+    def build(cls, person_ids, person_names, person_births,
+              movie_ids, movie_titles, movie_years,
+              star_people, star_movies):
+        """
+        Builds a graph from lists of people and movies and parallel
+        arrays of (person, movie) star indices.
+        """
+        movie_offsets, movie_people = build_csr(
+            len(movie_ids), star_movies, star_people
+        )
+
+        # Emitting stars movie by movie in year order leaves each
+        # person's movies sorted by year, so year filters are slices
+        by_year = sorted(range(len(movie_ids)), key=movie_years.__getitem__)
+        year_people, year_movies = array("i"), array("i")
+        for movie in by_year:
+            cast = movie_people[movie_offsets[movie]:movie_offsets[movie + 1]]
+            year_people.extend(cast)
+            year_movies.extend([movie] * len(cast))
+        person_offsets, person_movies = build_csr(
+            len(person_ids), year_people, year_movies
+        )
+        person_components = label_components(len(person_ids), (
+            movie_people[movie_offsets[m]:movie_offsets[m + 1]]
+            for m in range(len(movie_ids))
+        ))
+        person_table = StringTable.from_strings(person_ids)
+        name_table = StringTable.from_strings(person_names)
+        movie_table = StringTable.from_strings(movie_ids)
+        return cls(
+            person_table, name_table, person_births,
+            movie_table, StringTable.from_strings(movie_titles), movie_years,
+            person_offsets, person_movies, movie_offsets, movie_people,
+            SortedIndex.build(person_ids, person_table).order,
+            SortedIndex.build(movie_ids, movie_table).order,
+            SortedIndex.build(person_names, name_table, lower=True).order,
+            person_components, count_labels(person_components)
+        )
+
+    @classmethod
+    def from_csv(cls, directory):
+        """
+        Loads a graph from the people, movies and stars CSV files.
+        """
+        person_ids, person_names, person_births = [], [], array("h")
+        with open(f"{directory}/people.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                person_ids.append(row["id"])
+                person_names.append(row["name"])
+                person_births.append(parse_year(row["birth"]))
+
+        movie_ids, movie_titles, movie_years = [], [], array("h")
+        with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                movie_ids.append(row["id"])
+                movie_titles.append(row["title"])
+                movie_years.append(parse_year(row["year"]))
+
+        person_index = {pid: i for i, pid in enumerate(person_ids)}
+        movie_index = {mid: i for i, mid in enumerate(movie_ids)}
+        star_people, star_movies = array("i"), array("i")
+        seen = set()
+        with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                person = person_index.get(row["person_id"])
+                movie = movie_index.get(row["movie_id"])
+                if person is None or movie is None or (person, movie) in seen:
+                    continue
+                seen.add((person, movie))
+                star_people.append(person)
+                star_movies.append(movie)
+
+        return cls.build(person_ids, person_names, person_births,
+                         movie_ids, movie_titles, movie_years,
+                         star_people, star_movies)
+
+    @classmethod
+    def load(cls, directory, snapshot=True, parse=None):
+        """
+        Loads a graph from `directory`, memory-mapping its snapshot
+        when one is up to date and otherwise parsing the CSV files
+        and writing a fresh snapshot next to them.
+
+        `parse(directory)` builds a graph from the CSV files and
+        defaults to `from_csv`.
+        """
+        if parse is None:
+            parse = cls.from_csv
+        if not snapshot:
+            return parse(directory)
+
+        stamp = cls.csv_stamp(directory)
+        sections = cls.read_sections(directory, stamp)
+        if sections is not None:
+            return cls.from_sections(sections)
+
+        graph = parse(directory)
+        try:
+            write_snapshot(os.path.join(directory, SNAPSHOT_NAME), stamp,
+                           graph.sections(), cls.SNAPSHOT_VERSION)
+        except OSError:
+            pass
+        return graph
+
+    @staticmethod
+    def csv_stamp(directory):
+        """
+        Returns the source stamp of the CSV files in `directory`.
+        """
+        return source_stamp([
+            os.path.join(directory, name) for name in CSV_FILES
+        ])
+
+    @classmethod
+    def read_sections(cls, directory, stamp=None):
+        """
+        Returns the sections of the snapshot in `directory`, or None
+        unless it exists and is up to date with the CSV files, or with
+        `stamp` when given.
+        """
+        if stamp is None:
+            stamp = cls.csv_stamp(directory)
+        sections = read_snapshot(
+            os.path.join(directory, SNAPSHOT_NAME), stamp, cls.SNAPSHOT_VERSION
+        )
+        if sections is None or not cls.section_names() <= sections.keys():
+            return None
+        return sections
+
+    @classmethod
+    def from_sections(cls, sections):
+        """
+        Builds a graph from the named buffers of a snapshot.
+        """
+        fields = {name: sections[name] for name in cls.ARRAYS}
+        for name in cls.TABLES:
+            fields[name] = StringTable(
+                sections[f"{name}.blob"], sections[f"{name}.offsets"]
+            )
+        return cls(**fields)
+
+    @classmethod
+    def section_names(cls):
+        """
+        Returns the set of section names a snapshot must hold.
+        """
+        names = set(cls.ARRAYS)
+        for name in cls.TABLES:
+            names.update([f"{name}.blob", f"{name}.offsets"])
+        return names
+
+    def sections(self):
+        """
+        Returns the graph as named (typecode, buffer) snapshot sections.
+        """
+        sections = {
+            name: (typecode, getattr(self, name))
+            for name, typecode in self.ARRAYS.items()
+        }
+        for name in self.TABLES:
+            table = getattr(self, name)
+            sections[f"{name}.blob"] = ("B", table.blob)
+            sections[f"{name}.offsets"] = ("q", table.offsets)
+        return sections
+
+    def movies_of(self, person):
+        """
+        Returns the movie indices of a person index.
+        """
+        movies = self.person_movies[
+            self.person_offsets[person]:self.person_offsets[person + 1]
+        ]
+        extra = self.extra_person_movies.get(person)
+        return list(movies) + extra if extra else movies
+
+    def stars_of(self, movie):
+        """
+        Returns the person indices of a movie index.
+        """
+        people = self.movie_people[
+            self.movie_offsets[movie]:self.movie_offsets[movie + 1]
+        ]
+        extra = self.extra_movie_people.get(movie)
+        return list(people) + extra if extra else people
+
+    def neighbors(self, person):
+        """
+        Yields (movie, person) index pairs for people
+        who starred with a given person index.
+        """
+        person_movies, movie_people = self.person_movies, self.movie_people
+        movie_offsets = self.movie_offsets
+        extra_people = self.extra_movie_people
+        for k in range(self.person_offsets[person], self.person_offsets[person + 1]):
+            movie = person_movies[k]
+            for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                yield movie, movie_people[j]
+            if extra_people and movie in extra_people:
+                for neighbor in extra_people[movie]:
+                    yield movie, neighbor
+        for movie in self.extra_person_movies.get(person, ()):
+            for neighbor in self.stars_of(movie):
+                yield movie, neighbor
+
+    def constrained_neighbors(self, constraints):
+        """
+        Returns a neighbors function, like `neighbors`, that only yields
+        pairs allowed by `constraints`. Each person's movies are sorted by
+        year, so the year range is found by bisection, not a scan.
+        """
+        person_offsets, person_movies = self.person_offsets, self.person_movies
+        movie_offsets, movie_people = self.movie_offsets, self.movie_people
+        years = self.movie_years
+        extra_people, extra_movies = self.extra_movie_people, self.extra_person_movies
+        min_year, max_year = constraints.min_year, constraints.max_year
+        max_cast = constraints.max_cast
+        exclude_movies = {
+            self.movie_index[movie_id] for movie_id in constraints.exclude_movies
+            if movie_id in self.movie_index
+        }
+        exclude_people = {
+            self.person_index[person_id] for person_id in constraints.exclude_people
+            if person_id in self.person_index
+        }
+
+        def neighbors(person):
+            start, end = person_offsets[person], person_offsets[person + 1]
+            if min_year is not None:
+                start = bisect.bisect_left(
+                    person_movies, min_year, start, end, key=years.__getitem__
+                )
+            if max_year is not None:
+                end = bisect.bisect_right(
+                    person_movies, max_year, start, end, key=years.__getitem__
+                )
+            for k in range(start, end):
+                movie = person_movies[k]
+                first, last = movie_offsets[movie], movie_offsets[movie + 1]
+                extra = extra_people.get(movie, ()) if extra_people else ()
+                if movie in exclude_movies:
+                    continue
+                if max_cast is not None and last - first + len(extra) > max_cast:
+                    continue
+                for j in range(first, last):
+                    neighbor = movie_people[j]
+                    if neighbor not in exclude_people:
+                        yield movie, neighbor
+                for neighbor in extra:
+                    if neighbor not in exclude_people:
+                        yield movie, neighbor
+
+            # Movies credited by apply_delta are few, so scan them
+            for movie in extra_movies.get(person, ()):
+                year = years[movie]
+                cast = self.stars_of(movie)
+                if movie in exclude_movies:
+                    continue
+                if min_year is not None and year < min_year:
+                    continue
+                if max_year is not None and year > max_year:
+                    continue
+                if max_cast is not None and len(cast) > max_cast:
+                    continue
+                for neighbor in cast:
+                    if neighbor not in exclude_people:
+                        yield movie, neighbor
+
+        return neighbors
+
+    def shortest_path(self, source, target, search=None, constraints=None):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target IMDB ids.
+
+        If no possible path, returns None.
+
+        `search` runs on person indices and defaults to
+        `bidirectional_search`, or to a bidirectional search restricted
+        by `constraints` when those are given.
+        """
+        if constraints is not None and not constraints.allows_endpoints(
+            source, target
+        ):
+            return None
+        source, target = self.person_index[source], self.person_index[target]
+        if not self.connected(source, target):
+            return None
+        if search is None:
+            if constraints is not None:
+                neighbors = self.constrained_neighbors(constraints)
+                search = lambda s, t: bidirectional_bfs(s, t, neighbors)
+            else:
+                search = self.bidirectional_search
+        path = search(source, target)
+        if path is None:
+            return None
+        return [(self.movie_ids[m], self.person_ids[p]) for m, p in path]
+
+    def component(self, person):
+        """
+        Returns the component label of a person index.
+        """
+        return resolve_label(self.component_alias, self.person_components[person])
+
+    def connected(self, source, target):
+        """
+        Returns True if two person indices are in the same component.
+        """
+        return self.component(source) == self.component(target)
+
+    def apply_delta(self, people_rows, movie_rows, star_rows):
+        """
+        Adds people, movies and stars rows, shaped like the CSV rows,
+        on top of the loaded graph without rebuilding it. Rows for ids
+        already present are skipped. Added rows live beside the packed
+        arrays and are not written to snapshots, which keep covering
+        only the CSV files.
+
+        Returns (people, movies, stars) lists of the indices added:
+        person indices, movie indices and (person, movie) pairs.
+        """
+        for name in ["person_births", "movie_years", "person_offsets",
+                     "movie_offsets", "person_components", "component_sizes"]:
+            values = getattr(self, name)
+            if not isinstance(values, array):
+                copy = array(self.ARRAYS[name])
+                copy.frombytes(memoryview(values).cast("B"))
+                setattr(self, name, copy)
+
+        added_people = []
+        known = self.person_index.lookup(row["id"] for row in people_rows)
+        for row in people_rows:
+            if known[row["id"]] is not None:
+                continue
+            person = len(self.person_ids)
+            known[row["id"]] = person
+            self.person_ids.append(row["id"])
+            self.person_names.append(row["name"])
+            self.person_births.append(parse_year(row["birth"]))
+            self.person_offsets.append(self.person_offsets[-1])
+            self.person_components.append(len(self.component_sizes))
+            self.component_sizes.append(1)
+            self.person_index.add(row["id"], person)
+            self.name_index.add(row["name"], person)
+            added_people.append(person)
+
+        added_movies = []
+        known = self.movie_index.lookup(row["id"] for row in movie_rows)
+        for row in movie_rows:
+            if known[row["id"]] is not None:
+                continue
+            movie = len(self.movie_ids)
+            known[row["id"]] = movie
+            self.movie_ids.append(row["id"])
+            self.movie_titles.append(row["title"])
+            self.movie_years.append(parse_year(row["year"]))
+            self.movie_offsets.append(self.movie_offsets[-1])
+            self.movie_index.add(row["id"], movie)
+            added_movies.append(movie)
+
+        # Each distinct id is looked up once, and each touched movie's
+        # cast is gathered once, before the new stars are attached
+        person_of = self.person_index.lookup(
+            row["person_id"] for row in star_rows
+        )
+        movie_of = self.movie_index.lookup(row["movie_id"] for row in star_rows)
+        casts = {}
+        added_stars = []
+        for row in star_rows:
+            person = person_of[row["person_id"]]
+            movie = movie_of[row["movie_id"]]
+            if person is None or movie is None:
+                continue
+            cast = casts.get(movie)
+            if cast is None:
+                cast = casts[movie] = set(self.stars_of(movie))
+            if person in cast:
+                continue
+            if cast:
+                merge_labels(
+                    self.component_alias, self.component_sizes,
+                    self.component(next(iter(cast))), self.component(person)
+                )
+            cast.add(person)
+            added_stars.append((person, movie))
+
+        extra_person_movies = self.extra_person_movies
+        extra_movie_people = self.extra_movie_people
+        for person, movie in added_stars:
+            extra_person_movies.setdefault(person, []).append(movie)
+            extra_movie_people.setdefault(movie, []).append(person)
+
+        return added_people, added_movies, added_stars
+
+    def bidirectional_search(self, source, target):
+        """
+        Bidirectional BFS over person indices, expanding one full layer
+        of the smaller frontier at a time.
+
+        Returns a list of (movie, person) index pairs, or None.
+        """
+        return bidirectional_bfs(source, target, self.neighbors)
+
+    def people_view(self):
+        """
+        Returns a read-only mapping shaped like degrees.people.
+        """
+        return PeopleView(self)
+
+    def movies_view(self):
+        """
+        Returns a read-only mapping shaped like degrees.movies.
+        """
+        return MoviesView(self)
+
+    def names_view(self):
+        """
+        Returns a read-only mapping shaped like degrees.names.
+        """
+        return NamesView(self)
+
+
+def bidirectional_bfs(source, target, neighbors):
+    """
+    Breadth-first search grown from both the source and the target,
+    always expanding one full layer of whichever frontier is smaller.
+    `neighbors(person)` yields (movie, person) pairs.
+
+    Returns the list of (movie, person) pairs leading from
+    source to target, or None if the two are not connected.
+    """
+    if source == target:
+        return []
+
+    # Each side maps a person to the (movie, person) step towards its
+    # own root, plus the person's distance from that root
+    forward = {source: None}
+    backward = {target: None}
+    forward_depth = {source: 0}
+    backward_depth = {target: 0}
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    while forward_frontier and backward_frontier:
+        # Expand the smaller side, keeping the sides straight for splicing
+        expand_forward = len(forward_frontier) <= len(backward_frontier)
+        if expand_forward:
+            frontier, parents, depth = forward_frontier, forward, forward_depth
+            other_depth = backward_depth
+        else:
+            frontier, parents, depth = backward_frontier, backward, backward_depth
+            other_depth = forward_depth
+
+        # Finish the whole layer so the best meeting point is found
+        best = None
+        next_frontier = []
+        for person in frontier:
+            next_depth = depth[person] + 1
+            for movie, neighbor in neighbors(person):
+                if neighbor in parents:
+                    continue
+                parents[neighbor] = (movie, person)
+                depth[neighbor] = next_depth
+                next_frontier.append(neighbor)
+                if neighbor in other_depth:
+                    length = next_depth + other_depth[neighbor]
+                    if best is None or length < best[0]:
+                        best = (length, neighbor)
+
+        if best is not None:
+            return splice_path(forward, backward, best[1])
+
+        if expand_forward:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+
+    return None
+
+
+def splice_path(forward, backward, meeting):
+    """
+    Joins the forward chain ending at `meeting` with the backward
+    chain starting at `meeting` into a single source-to-target path.
+    """
+    path = []
+    person = meeting
+    while forward[person] is not None:
+        movie, parent = forward[person]
+        path.append((movie, person))
+        person = parent
+    path.reverse()
+
+    person = meeting
+    while backward[person] is not None:
+        movie, child = backward[person]
+        path.append((movie, child))
+        person = child
+    return path
+
+
+class PeopleView(Mapping):
+    """
+    Maps person_ids to a dictionary of: name, birth, movies,
+    built on demand from a CompactGraph.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, person_id):
+        graph = self.graph
+        i = graph.person_index[person_id]
+        birth = graph.person_births[i]
+        return {
+            "name": graph.person_names[i],
+            "birth": str(birth) if birth else "",
+            "movies": {graph.movie_ids[m] for m in graph.movies_of(i)}
+        }
+
+    def __iter__(self):
+        return iter(self.graph.person_ids)
+
+    def __len__(self):
+        return len(self.graph.person_ids)
+
+    def __contains__(self, person_id):
+        return person_id in self.graph.person_index
+
+
+class MoviesView(Mapping):
+    """
+    Maps movie_ids to a dictionary of: title, year, stars,
+    built on demand from a CompactGraph.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, movie_id):
+        graph = self.graph
+        i = graph.movie_index[movie_id]
+        year = graph.movie_years[i]
+        return {
+            "title": graph.movie_titles[i],
+            "year": str(year) if year else "",
+            "stars": {graph.person_ids[p] for p in graph.stars_of(i)}
+        }
+
+    def __iter__(self):
+        return iter(self.graph.movie_ids)
+
+    def __len__(self):
+        return len(self.graph.movie_ids)
+
+    def __contains__(self, movie_id):
+        return movie_id in self.graph.movie_index
+
+
+class NamesView(Mapping):
+    """
+    Maps lowercased names to a set of corresponding person_ids.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, name):
+        person_ids = self.graph.person_ids
+        indices = self.graph.name_index.find(name)
+        if not indices:
+            raise KeyError(name)
+        return {person_ids[i] for i in indices}
+
+    def __iter__(self):
+        return self.graph.name_index.keys()
+
+    def __len__(self):
+        return sum(1 for _ in self.graph.name_index.keys())
+
+    def __contains__(self, name):
+        return name in self.graph.name_index
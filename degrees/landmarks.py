@@ -0,0 +1,238 @@
+"""
+Landmark distance oracle for the compact degrees graph.
+
+BFS distances from k high-degree people ("landmarks") bound the
+separation of any two people by the triangle inequality:
+
+    |d(L, s) - d(L, t)| <= d(s, t) <= d(L, s) + d(L, t)
+
+The lower bound is also an admissible A* heuristic, so exact searches
+guided by it expand fewer people than plain BFS.
+"""
+
+import heapq
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from graph import CSV_FILES, CompactGraph
+from snapshot import read_snapshot, source_stamp, write_snapshot
+
+DEFAULT_LANDMARKS = 16
+
+# Distance recorded for people a landmark cannot reach
+UNREACHABLE = -1
+
+
+def landmark_distances(graph, landmark):
+    """
+    Returns an array of BFS distances from a landmark person index
+    to every person index, UNREACHABLE where there is no path.
+    """
+    person_offsets, person_movies = graph.person_offsets, graph.person_movies
+    movie_offsets, movie_people = graph.movie_offsets, graph.movie_people
+    distances = array("h", [UNREACHABLE]) * len(graph.person_ids)
+    seen_movies = bytearray(len(graph.movie_ids))
+
+    distances[landmark] = 0
+    frontier = [landmark]
+    depth = 0
+    while frontier:
+        depth += 1
+        next_frontier = []
+        for person in frontier:
+            for k in range(person_offsets[person], person_offsets[person + 1]):
+                movie = person_movies[k]
+                # Every cast member is reached the first time a movie is seen
+                if seen_movies[movie]:
+                    continue
+                seen_movies[movie] = 1
+                for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                    neighbor = movie_people[j]
+                    if distances[neighbor] == UNREACHABLE:
+                        distances[neighbor] = depth
+                        next_frontier.append(neighbor)
+        frontier = next_frontier
+    return distances
+
+
+def choose_landmarks(graph, count):
+    """
+    Returns the `count` person indices who starred in the most movies.
+    """
+    offsets = graph.person_offsets
+    return heapq.nlargest(
+        count, range(len(graph.person_ids)),
+        key=lambda person: offsets[person + 1] - offsets[person]
+    )
+
+
+# Graph each worker process memory-maps from the snapshot once
+_worker_graph = None
+
+
+def _init_worker(directory):
+    global _worker_graph
+    _worker_graph = CompactGraph.load(directory)
+
+
+def _worker_distances(landmark):
+    return landmark_distances(_worker_graph, landmark).tobytes()
+
+
+class LandmarkOracle():
+    """
+    Precomputed BFS distances from a set of landmark people.
+    Row l of `distances` holds the distances from landmarks[l].
+    """
+
+    def __init__(self, graph, landmarks, distances):
+        self.graph = graph
+        self.landmarks = landmarks
+        self.distances = distances
+        self.size = len(graph.person_ids)
+
+    @classmethod
+    def build(cls, graph, directory=None, count=DEFAULT_LANDMARKS,
+              processes=None):
+        """
+        Computes distances from the `count` highest-degree people.
+        When `directory` holds an up-to-date snapshot of the graph, the
+        BFS runs for each landmark in parallel in a process pool whose
+        workers memory-map it; otherwise every BFS runs in this process,
+        as workers would each have to parse the CSV files again.
+        """
+        landmarks = array("i", choose_landmarks(graph, count))
+        distances = array("h")
+        if (directory is None or processes == 1
+                or CompactGraph.read_sections(directory) is None):
+            for landmark in landmarks:
+                distances.extend(landmark_distances(graph, landmark))
+        else:
+            with ProcessPoolExecutor(
+                max_workers=processes,
+                initializer=_init_worker, initargs=(directory,)
+            ) as executor:
+                for row in executor.map(_worker_distances, landmarks):
+                    distances.frombytes(row)
+        return cls(graph, landmarks, distances)
+
+    @classmethod
+    def load(cls, graph, directory, count=DEFAULT_LANDMARKS, processes=None):
+        """
+        Loads the oracle persisted next to the CSV files in `directory`,
+        building and saving it first if it is missing or stale.
+        """
+        path = os.path.join(directory, f"landmarks-{count}.snapshot")
+        stamp = source_stamp([
+            os.path.join(directory, name) for name in CSV_FILES
+        ])
+        sections = read_snapshot(path, stamp)
+        if sections is not None:
+            return cls(graph, sections["landmarks"], sections["distances"])
+
+        oracle = cls.build(graph, directory, count, processes)
+        try:
+            write_snapshot(path, stamp, {
+                "landmarks": ("i", oracle.landmarks),
+                "distances": ("h", oracle.distances)
+            })
+        except OSError:
+            pass
+        return oracle
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper) bounds on the degrees of separation of two
+        person indices. `upper` is None when no landmark reaches both.
+        Returns None if the two people are not connected.
+        """
+        if not self.graph.connected(source, target):
+            return None
+        if source == target:
+            return 0, 0
+
+        lower, upper = 1, None
+        distances, size = self.distances, self.size
+        for row in range(0, len(distances), size):
+            to_source = distances[row + source]
+            to_target = distances[row + target]
+            if to_source == UNREACHABLE or to_target == UNREACHABLE:
+                continue
+            lower = max(lower, abs(to_source - to_target))
+            if upper is None or to_source + to_target < upper:
+                upper = to_source + to_target
+        return lower, upper
+
+    def heuristic(self, target):
+        """
+        Returns a function giving, for any person index, a lower bound
+        on its separation from `target`.
+        """
+        distances, size = self.distances, self.size
+        rows = [
+            (row, distances[row + target])
+            for row in range(0, len(distances), size)
+            if distances[row + target] != UNREACHABLE
+        ]
+
+        def estimate(person):
+            best = 0
+            for row, to_target in rows:
+                to_person = distances[row + person]
+                if to_person != UNREACHABLE:
+                    gap = abs(to_person - to_target)
+                    if gap > best:
+                        best = gap
+            return best
+
+        return estimate
+
+    def search(self, source, target, neighbors=None):
+        """
+        A* search between two person indices guided by the landmark
+        lower bounds. Returns a list of (movie, person) index pairs,
+        or None if the two are not connected.
+
+        `neighbors` replaces the graph's own, e.g. with
+        `graph.constrained_neighbors`; the bounds stay admissible since
+        dropping movies or people only lengthens separations.
+        """
+        if not self.graph.connected(source, target):
+            return None
+        if neighbors is None:
+            neighbors = self.graph.neighbors
+
+        estimate = self.heuristic(target)
+        parents = {source: None}
+        cost = {source: 0}
+        closed = set()
+        # Ties go to the deeper person, which is closer to the target
+        frontier = [(estimate(source), 0, source)]
+        while frontier:
+            _, negative_depth, person = heapq.heappop(frontier)
+            if person == target:
+                break
+            if person in closed:
+                continue
+            closed.add(person)
+            depth = -negative_depth + 1
+            for movie, neighbor in neighbors(person):
+                if neighbor in closed or cost.get(neighbor, depth + 1) <= depth:
+                    continue
+                cost[neighbor] = depth
+                parents[neighbor] = (movie, person)
+                heapq.heappush(
+                    frontier, (depth + estimate(neighbor), -depth, neighbor)
+                )
+        else:
+            return None
+
+        path = []
+        person = target
+        while parents[person] is not None:
+            movie, parent = parents[person]
+            path.append((movie, person))
+            person = parent
+        path.reverse()
+        return path
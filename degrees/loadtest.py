@@ -0,0 +1,81 @@
+"""
+Load test for the degrees query server.
+
+Opens several client connections in parallel and sends queries between
+random pairs of people, then reports throughput and latency percentiles.
+
+Usage: python loadtest.py [--clients N] [--queries N] [--seed N] directory
+"""
+
+import argparse
+import csv
+import random
+import threading
+import time
+
+from client import Client
+from server import DEFAULT_HOST, DEFAULT_PORT
+
+
+def percentile(values, fraction):
+    """
+    Returns the value at `fraction` through the sorted `values`.
+    """
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test a degrees server.")
+    parser.add_argument("directory", help="dataset to draw person ids from")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    with open(f"{args.directory}/people.csv", encoding="utf-8") as f:
+        person_ids = [row["id"] for row in csv.DictReader(f)]
+    rng = random.Random(args.seed)
+    pairs = [
+        (rng.choice(person_ids), rng.choice(person_ids))
+        for _ in range(args.queries)
+    ]
+
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def worker(chunk):
+        with Client(args.host, args.port) as client:
+            for source, target in chunk:
+                start = time.perf_counter()
+                response = client.query(source, target)
+                elapsed = (time.perf_counter() - start) * 1000
+                with lock:
+                    latencies.append(elapsed)
+                    if "error" in response:
+                        errors.append(response["error"])
+
+    threads = [
+        threading.Thread(target=worker, args=(pairs[i::args.clients],))
+        for i in range(args.clients)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(latencies)} queries from {args.clients} clients in {elapsed:.2f}s")
+    print(f"Throughput: {len(latencies) / elapsed:.1f} queries/s")
+    print(f"Latency p50: {percentile(latencies, 0.50):.2f} ms, "
+          f"p99: {percentile(latencies, 0.99):.2f} ms")
+    if errors:
+        print(f"{len(errors)} errors, first: {errors[0]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Sorted name index for degrees supporting exact, prefix and fuzzy lookups.
+
+Lowercased names are kept in one sorted sequence with a parallel sequence
+of person_ids. The sorted sequence doubles as an implicit trie: the names
+sharing a prefix form a contiguous range found by bisection, which lets
+fuzzy search walk the trie with a Levenshtein row per prefix and prune
+every branch whose best distance already exceeds the bound.
+
+Names added after the index is built go into a second, list-backed
+index whose results are merged into every lookup.
+"""
+
+import bisect
+from collections.abc import Sequence
+
+# Sorts after every character that can appear in a name
+_MAX_CHAR = "\U0010ffff"
+
+
+class NameIndex():
+    """
+    Looks up person_ids by lowercased name.
+    """
+
+    def __init__(self, keys, person_ids):
+        self.keys = keys
+        self.person_ids = person_ids
+        self.added = None
+
+    @classmethod
+    def from_people(cls, people):
+        """
+        Builds an index from a dictionary shaped like degrees.people.
+        """
+        entries = sorted(
+            (person["name"].lower(), person_id)
+            for person_id, person in people.items()
+        )
+        return cls([key for key, _ in entries], [pid for _, pid in entries])
+
+    @classmethod
+    def from_graph(cls, graph):
+        """
+        Builds an index over a CompactGraph's sorted name permutation,
+        without copying any names.
+        """
+        index = graph.name_index
+        return cls(
+            _OrderView(index.order, index.key),
+            _OrderView(index.order, graph.person_ids.__getitem__)
+        )
+
+    def add(self, name, person_id):
+        """
+        Adds a person_id under `name` without rebuilding the index.
+        """
+        if self.added is None:
+            self.added = NameIndex([], [])
+        key = name.lower()
+        i = bisect.bisect_right(self.added.keys, key)
+        self.added.keys.insert(i, key)
+        self.added.person_ids.insert(i, person_id)
+
+    def exact(self, name):
+        """
+        Returns the person_ids whose name matches exactly, ignoring case.
+        """
+        name = name.lower()
+        start = bisect.bisect_left(self.keys, name)
+        end = bisect.bisect_right(self.keys, name, lo=start)
+        found = [self.person_ids[i] for i in range(start, end)]
+        if self.added is not None:
+            found.extend(self.added.exact(name))
+        return found
+
+    def prefix(self, prefix, limit=10):
+        """
+        Returns up to `limit` (name, person_id) pairs whose name starts
+        with `prefix`, ignoring case, in alphabetical order.
+        """
+        prefix = prefix.lower()
+        start = bisect.bisect_left(self.keys, prefix)
+        end = min(len(self.keys), start + limit)
+        matches = []
+        for i in range(start, end):
+            key = self.keys[i]
+            if not key.startswith(prefix):
+                break
+            matches.append((key, self.person_ids[i]))
+        if self.added is not None:
+            matches = sorted(matches + self.added.prefix(prefix, limit))[:limit]
+        return matches
+
+    def fuzzy(self, name, max_distance=2, limit=10):
+        """
+        Returns up to `limit` (distance, name, person_id) triples for names
+        within `max_distance` edits of `name`, ignoring case, closest first.
+        """
+        name = name.lower()
+        keys = self.keys
+        found = []
+
+        # Each stack entry is a prefix, the key range sharing it and the
+        # Levenshtein row of edit distances from `name` to that prefix
+        stack = [("", 0, len(keys), list(range(len(name) + 1)))]
+        while stack:
+            prefix, start, end, row = stack.pop()
+            depth = len(prefix)
+
+            # Keys equal to the prefix itself end here
+            if start < end and len(keys[start]) == depth:
+                stop = bisect.bisect_right(keys, prefix, lo=start, hi=end)
+                if row[-1] <= max_distance:
+                    for i in range(start, stop):
+                        found.append((row[-1], prefix, self.person_ids[i]))
+                start = stop
+
+            # Split the rest of the range by its next character
+            while start < end:
+                char = keys[start][depth]
+                child = prefix + char
+                stop = bisect.bisect_left(
+                    keys, prefix + chr(ord(char) + 1), lo=start, hi=end
+                ) if char != _MAX_CHAR else end
+                next_row = [row[0] + 1]
+                for i, expected in enumerate(name):
+                    next_row.append(min(
+                        next_row[i] + 1,
+                        row[i + 1] + 1,
+                        row[i] + (expected != char)
+                    ))
+                if min(next_row) <= max_distance:
+                    stack.append((child, start, stop, next_row))
+                start = stop
+
+        if self.added is not None:
+            found.extend(self.added.fuzzy(name, max_distance, limit))
+        found.sort()
+        return found[:limit]
+
+
+class _OrderView(Sequence):
+    """
+    Sequence of `value(order[k])` for each position k of a permutation.
+    """
+
+    def __init__(self, order, value):
+        self.order = order
+        self.value = value
+
+    def __getitem__(self, k):
+        return self.value(self.order[k])
+
+    def __len__(self):
+        return len(self.order)
@@ -0,0 +1,243 @@
+"""
+Enumeration of all shortest paths and k shortest paths between two people.
+
+All searches take a `neighbors(person)` function yielding (movie, person)
+pairs, so they run on IMDB ids with the dict backend or on person indices
+with the compact graph.
+
+All shortest paths are streamed from a layered DAG: a bidirectional BFS
+finds the separation and the distance of every person on some shortest
+path from one end, and paths are then generated depth-first from the
+source, one at a time, so memory stays proportional to the DAG rather
+than to the number of paths.
+"""
+
+import heapq
+import itertools
+import time
+
+from graph import bidirectional_bfs
+
+
+def _layers(source, target, neighbors):
+    """
+    Expands full BFS layers from both ends, the smaller side first, until
+    they meet. Returns (forward, backward, distance) where the dictionaries
+    map people to their distance from the source and from the target,
+    or None if the two are not connected.
+    """
+    forward, backward = {source: 0}, {target: 0}
+    forward_frontier, backward_frontier = [source], [target]
+    if source == target:
+        return forward, backward, 0
+
+    while forward_frontier and backward_frontier:
+        expand_forward = len(forward_frontier) <= len(backward_frontier)
+        if expand_forward:
+            frontier, depth, other = forward_frontier, forward, backward
+        else:
+            frontier, depth, other = backward_frontier, backward, forward
+
+        met = False
+        next_frontier = []
+        for person in frontier:
+            next_depth = depth[person] + 1
+            for _, neighbor in neighbors(person):
+                if neighbor in depth:
+                    continue
+                depth[neighbor] = next_depth
+                next_frontier.append(neighbor)
+                met = met or neighbor in other
+
+        if expand_forward:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+
+        if met:
+            distance = min(
+                forward[person] + backward[person]
+                for person in (forward if len(forward) < len(backward) else backward)
+                if person in forward and person in backward
+            )
+            return forward, backward, distance
+    return None
+
+
+class ShortestPathDAG():
+    """
+    The (movie, person) steps lying on some shortest path between two
+    people, built lazily from the BFS layers of both ends.
+    """
+
+    def __init__(self, source, target, neighbors, forward, backward, distance):
+        self.source = source
+        self.target = target
+        self.neighbors = neighbors
+        self.forward = forward
+        self.backward = backward
+        self.distance = distance
+        # Positions up to `split` are checked against forward distances,
+        # later positions against backward distances
+        self.split = min(distance, max(forward.values()))
+        self.successor_cache = {}
+
+        # People at each position up to `split` that lead to the target
+        meeting = {
+            person for person, depth in forward.items()
+            if depth == self.split and backward.get(person) == distance - depth
+        }
+        self.valid = [set() for _ in range(self.split + 1)]
+        self.valid[self.split] = meeting
+        for position in range(self.split, 0, -1):
+            for person in self.valid[position]:
+                for _, neighbor in neighbors(person):
+                    if forward.get(neighbor) == position - 1:
+                        self.valid[position - 1].add(neighbor)
+
+    @classmethod
+    def build(cls, source, target, neighbors):
+        """
+        Returns the DAG of shortest paths, or None if not connected.
+        """
+        layers = _layers(source, target, neighbors)
+        if layers is None:
+            return None
+        return cls(source, target, neighbors, *layers)
+
+    def on_dag(self, person, position):
+        """
+        Returns True if `person` lies at `position` on a shortest path.
+        """
+        if position <= self.split:
+            return person in self.valid[position]
+        return self.backward.get(person) == self.distance - position
+
+    def successors(self, person, position):
+        """
+        Returns the (movie, person) steps from `person` at `position`
+        that continue a shortest path.
+        """
+        key = (person, position)
+        steps = self.successor_cache.get(key)
+        if steps is None:
+            steps = [
+                (movie, neighbor) for movie, neighbor in self.neighbors(person)
+                if self.on_dag(neighbor, position + 1)
+            ]
+            self.successor_cache[key] = steps
+        return steps
+
+    def count(self):
+        """
+        Returns the number of shortest paths, without enumerating them.
+        """
+        counts = {self.source: 1}
+        for position in range(self.distance):
+            next_counts = {}
+            for person, ways in counts.items():
+                for _, neighbor in self.successors(person, position):
+                    next_counts[neighbor] = next_counts.get(neighbor, 0) + ways
+            counts = next_counts
+        return counts.get(self.target, 0)
+
+    def paths(self, limit=None, timeout=None):
+        """
+        Yields each shortest path as a list of (movie, person) pairs,
+        stopping after `limit` paths or `timeout` seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if self.distance == 0:
+            yield []
+            return
+
+        produced = 0
+        path = []
+        stack = [iter(self.successors(self.source, 0))]
+        while stack:
+            if deadline is not None and time.monotonic() > deadline:
+                return
+            step = next(stack[-1], None)
+            if step is None:
+                stack.pop()
+                if path:
+                    path.pop()
+                continue
+            path.append(step)
+            if len(path) == self.distance:
+                yield list(path)
+                produced += 1
+                if limit is not None and produced >= limit:
+                    return
+                path.pop()
+            else:
+                stack.append(iter(self.successors(step[1], len(path))))
+
+
+def all_shortest_paths(source, target, neighbors, limit=None, timeout=None):
+    """
+    Yields every shortest path from source to target as a list of
+    (movie, person) pairs, stopping after `limit` paths or `timeout`
+    seconds. Yields nothing if the two are not connected.
+    """
+    dag = ShortestPathDAG.build(source, target, neighbors)
+    if dag is not None:
+        yield from dag.paths(limit, timeout)
+
+
+def k_shortest_paths(source, target, neighbors, k, timeout=None):
+    """
+    Yields up to `k` loopless paths from source to target in order of
+    length, using Yen's algorithm with bidirectional BFS for each spur.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    first = bidirectional_bfs(source, target, neighbors)
+    if first is None or k <= 0:
+        return
+
+    found = [first]
+    yield first
+    candidates = []
+    seen = {tuple(first)}
+    counter = itertools.count()
+    while len(found) < k:
+        previous = found[-1]
+        people = [source] + [person for _, person in previous]
+        for i in range(len(previous)):
+            if deadline is not None and time.monotonic() > deadline:
+                return
+            spur, root = people[i], previous[:i]
+
+            # Ban the next step of every found path sharing this root,
+            # and every person already on the root
+            banned_edges = set()
+            for path in found:
+                if path[:i] == root:
+                    movie, person = path[i]
+                    banned_edges.add((movie, spur, person))
+                    banned_edges.add((movie, person, spur))
+            banned_people = set(people[:i])
+
+            def spur_neighbors(person, banned_edges=banned_edges,
+                               banned_people=banned_people):
+                for movie, neighbor in neighbors(person):
+                    if neighbor in banned_people:
+                        continue
+                    if (movie, person, neighbor) in banned_edges:
+                        continue
+                    yield movie, neighbor
+
+            spur_path = bidirectional_bfs(spur, target, spur_neighbors)
+            if spur_path is None:
+                continue
+            candidate = root + spur_path
+            key = tuple(candidate)
+            if key not in seen:
+                seen.add(key)
+                heapq.heappush(candidates, (len(candidate), next(counter), candidate))
+
+        if not candidates:
+            return
+        path = heapq.heappop(candidates)[2]
+        found.append(path)
+        yield path
@@ -0,0 +1,284 @@
+"""
+Long-running query server for degrees.
+
+Loads a dataset once and answers JSON-lines requests, one object per line:
+
+    {"id": 1, "source": "Kevin Bacon", "target": "102"}
+
+Sources and targets are IMDB person ids, exact names, or objects such as
+{"name": "Emma Watson", "birth": 1990} to pick between namesakes. Each response
+carries the request id, the path and the time the query took:
+
+    {"id": 1, "degrees": 1, "path": [...], "elapsed_ms": 0.12}
+
+When the server is started with --landmarks, a request with
+"estimate": true is answered with landmark bounds instead of a path:
+
+    {"id": 1, "lower": 2, "upper": 3, "elapsed_ms": 0.01}
+
+When the server is started with --allow-updates, a request naming a
+directory of delta CSV files adds their rows without reloading:
+
+    {"id": 1, "update": "deltas/2024-06"}
+    {"id": 1, "added": {"people": 3, "movies": 1, "stars": 4}, "locked_ms": 0.4, ...}
+
+The delta files are parsed before the update takes the write lock, so
+queries are only held back while the parsed rows are applied.
+
+Requests are read from a local TCP socket, where each connection is served
+on its own thread, or from stdin with responses written to stdout.
+
+Usage: python server.py [--stdin] [--landmarks K] [--processes N]
+                        [--allow-updates] [--host HOST] [--port PORT]
+                        [directory]
+"""
+
+import argparse
+import contextlib
+import json
+import socketserver
+import sys
+import threading
+import time
+
+import degrees
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 5050
+
+
+class ReadWriteLock():
+    """
+    Lets any number of readers hold the lock at once, or one writer.
+    A waiting writer holds back new readers so it is not starved.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.readers = 0
+        self.writer = False
+        self.waiting_writers = 0
+
+    @contextlib.contextmanager
+    def reading(self):
+        with self.condition:
+            while self.writer or self.waiting_writers:
+                self.condition.wait()
+            self.readers += 1
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.readers -= 1
+                if not self.readers:
+                    self.condition.notify_all()
+
+    @contextlib.contextmanager
+    def writing(self):
+        with self.condition:
+            self.waiting_writers += 1
+            while self.writer or self.readers:
+                self.condition.wait()
+            self.waiting_writers -= 1
+            self.writer = True
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.writer = False
+                self.condition.notify_all()
+
+
+# Guards the loaded data: queries read it, updates write it
+data_lock = ReadWriteLock()
+
+# Whether update requests are accepted
+updates_allowed = False
+
+
+def resolve_person(value):
+    """
+    Returns the person_id for an IMDB id, a name, or a dictionary with a
+    "name" and optional "birth" year. Raises ValueError, with suggestions
+    where there are any, when the person is unknown or ambiguous.
+    """
+    birth = None
+    if isinstance(value, dict):
+        birth = value.get("birth")
+        value = value.get("name", "")
+    value = str(value)
+    if birth is None and value in degrees.people:
+        return value
+
+    person_ids = degrees.person_ids_for_name(value, birth)
+    if len(person_ids) == 1:
+        return person_ids[0]
+    if person_ids:
+        raise ValueError(f"Ambiguous name {value!r}: {', '.join(person_ids)}")
+
+    message = f"Person not found: {value}"
+    suggestions = sorted({
+        name for _, name, _ in degrees.name_index.fuzzy(value, limit=20)
+    } | {
+        name for name, _ in degrees.name_index.prefix(value, limit=5)
+    })
+    if suggestions:
+        message += f" (did you mean: {', '.join(suggestions)}?)"
+    raise ValueError(message)
+
+
+def answer(request):
+    """
+    Returns the response dictionary for one request dictionary.
+    """
+    start = time.perf_counter()
+    response = {"id": request.get("id")}
+    try:
+        source = resolve_person(request["source"])
+        target = resolve_person(request["target"])
+    except KeyError as e:
+        response["error"] = f"Missing field: {e.args[0]}"
+        return response
+    except ValueError as e:
+        response["error"] = str(e)
+        return response
+
+    response["source"] = {
+        "person_id": source, "name": degrees.people[source]["name"]
+    }
+    response["target"] = {
+        "person_id": target, "name": degrees.people[target]["name"]
+    }
+    if request.get("estimate"):
+        if degrees.oracle is None:
+            response["error"] = "Estimates need a server started with --landmarks"
+            return response
+        bounds = degrees.separation_bounds(source, target)
+        response["lower"], response["upper"] = bounds or (None, None)
+        response["elapsed_ms"] = (time.perf_counter() - start) * 1000
+        return response
+
+    path = degrees.shortest_path(source, target)
+    if path is None:
+        response["degrees"] = None
+        response["path"] = None
+    else:
+        response["degrees"] = len(path)
+        response["path"] = [
+            {
+                "movie_id": movie_id,
+                "title": degrees.movies[movie_id]["title"],
+                "person_id": person_id,
+                "name": degrees.people[person_id]["name"]
+            }
+            for movie_id, person_id in path
+        ]
+    response["elapsed_ms"] = (time.perf_counter() - start) * 1000
+    return response
+
+
+def update(request):
+    """
+    Returns the response dictionary for one update request, applying
+    the delta CSV files in the directory it names.
+    """
+    start = time.perf_counter()
+    response = {"id": request.get("id")}
+    if not updates_allowed:
+        response["error"] = "Updates need a server started with --allow-updates"
+        return response
+    try:
+        rows = degrees.read_delta(str(request["update"]))
+    except (OSError, ValueError, KeyError) as e:
+        response["error"] = f"Bad update: {e}"
+        return response
+
+    with data_lock.writing():
+        locked = time.perf_counter()
+        response["added"] = degrees.apply_delta(*rows)
+        response["locked_ms"] = (time.perf_counter() - locked) * 1000
+    response["elapsed_ms"] = (time.perf_counter() - start) * 1000
+    return response
+
+
+def handle_line(line):
+    """
+    Returns the JSON response line for one JSON request line.
+    """
+    try:
+        request = json.loads(line)
+        if not isinstance(request, dict):
+            raise ValueError("request must be a JSON object")
+    except ValueError as e:
+        return json.dumps({"id": None, "error": f"Bad request: {e}"})
+    if "update" in request:
+        return json.dumps(update(request))
+    with data_lock.reading():
+        return json.dumps(answer(request))
+
+
+class QueryHandler(socketserver.StreamRequestHandler):
+    """
+    Answers each JSON line received on a connection.
+    """
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            response = handle_line(line.decode("utf-8"))
+            self.wfile.write(response.encode("utf-8") + b"\n")
+
+
+class QueryServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+def serve_stdin():
+    """
+    Answers JSON lines from stdin on stdout until end of input.
+    """
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        print(handle_line(line), flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer degrees queries.")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--stdin", action="store_true",
+                        help="read requests from stdin instead of a socket")
+    parser.add_argument("--landmarks", type=int, default=0,
+                        help="number of landmark people for estimates")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="worker processes for parsing the CSV files")
+    parser.add_argument("--allow-updates", action="store_true",
+                        help="accept requests that add delta CSV files")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    global updates_allowed
+    updates_allowed = args.allow_updates
+
+    print("Loading data...", file=sys.stderr)
+    degrees.load_data(args.directory, compact=True,
+                      landmarks=args.landmarks, processes=args.processes)
+    print("Data loaded.", file=sys.stderr)
+
+    if args.stdin:
+        serve_stdin()
+        return
+
+    with QueryServer((args.host, args.port), QueryHandler) as server:
+        print(f"Listening on {args.host}:{args.port}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
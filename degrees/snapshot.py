@@ -0,0 +1,101 @@
+"""
+Binary snapshots of named flat arrays, memory-mapped on load.
+
+A snapshot file is an 8-byte magic, an 8-byte header length, a JSON
+header, then each section's raw bytes aligned to 8 bytes. The header
+records the size and mtime of every source file the data was built from,
+and the format version of the data, so a snapshot whose sources or format
+have changed is treated as stale.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+
+MAGIC = b"DEGSNAP1"
+ALIGNMENT = 8
+
+
+def source_stamp(paths):
+    """
+    Returns the [name, size, mtime] stamp of each source file.
+    """
+    stamp = []
+    for path in paths:
+        stat = os.stat(path)
+        stamp.append([os.path.basename(path), stat.st_size, stat.st_mtime_ns])
+    return stamp
+
+
+def write_snapshot(path, stamp, sections, version=0):
+    """
+    Writes `sections`, a dictionary mapping names to (typecode, buffer)
+    pairs, to `path`, replacing any previous snapshot atomically.
+    """
+    layout = {}
+    offset = 0
+    for name, (typecode, buffer) in sections.items():
+        nbytes = memoryview(buffer).nbytes
+        layout[name] = [typecode, offset, nbytes]
+        offset += nbytes + (-nbytes % ALIGNMENT)
+
+    header = json.dumps({
+        "byteorder": sys.byteorder,
+        "version": version,
+        "sources": stamp,
+        "sections": layout
+    }).encode("utf-8")
+    header += b" " * (-len(header) % ALIGNMENT)
+
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(header).to_bytes(8, "little"))
+        f.write(header)
+        for typecode, buffer in sections.values():
+            nbytes = memoryview(buffer).nbytes
+            f.write(buffer)
+            f.write(bytes(-nbytes % ALIGNMENT))
+    os.replace(temporary, path)
+
+
+def read_snapshot(path, stamp, version=0):
+    """
+    Memory-maps the snapshot at `path` and returns a dictionary mapping
+    section names to memoryviews of their typecode.
+
+    Returns None if the snapshot is missing, unreadable, truncated or
+    corrupt, of another format version, or was built from sources that
+    no longer match `stamp`.
+    """
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    view = memoryview(buffer)
+    try:
+        if bytes(view[:8]) != MAGIC:
+            return None
+        length = int.from_bytes(view[8:16], "little")
+        header = json.loads(bytes(view[16:16 + length]).decode("utf-8"))
+        if (header["byteorder"] != sys.byteorder
+                or header.get("version", 0) != version
+                or header["sources"] != stamp):
+            return None
+
+        start = 16 + length
+        sections = {}
+        for name, (typecode, offset, nbytes) in header["sections"].items():
+            begin = start + offset
+            # A truncated or corrupt file is rebuilt rather than mapped
+            if (offset < 0 or begin + nbytes > len(view)
+                    or nbytes % struct.calcsize(typecode)):
+                return None
+            sections[name] = view[begin:begin + nbytes].cast(typecode)
+    except (KeyError, ValueError, TypeError, struct.error):
+        return None
+    return sections
@@ -0,0 +1,98 @@
+"""
+Benchmark of the PageRank solvers on a corpus.
+
+Crawls the corpus once, then runs every solver at each damping factor and
+reports its iterations, time, final residual and L1 distance from a
+reference solution, as JSON. The winner at each damping factor is the
+fastest solver whose ranks are within the tolerance of the reference.
+
+Usage: python benchmark.py [--damping D ...] [--tolerance T]
+                           [--solver NAME ...] [--history]
+                           [--output FILE] directory
+"""
+
+import argparse
+import json
+import time
+
+from crawler import crawl_graph
+from pagerank import DAMPING, SOLVERS, TOLERANCE, power_iteration
+from solvers import Convergence
+
+# The reference ranks are converged this far
+REFERENCE_TOLERANCE = 1e-12
+REFERENCE_ITERATIONS = 100000
+
+
+def compare(graph, damping_factor, tolerance, solvers, history=False):
+    """
+    Returns a dictionary of results for each solver on a LinkGraph,
+    and the name of the winner.
+    """
+    reference, _ = power_iteration(
+        graph, damping_factor, REFERENCE_TOLERANCE, REFERENCE_ITERATIONS
+    )
+    results = {}
+    for name in solvers:
+        convergence = Convergence(name)
+        start = time.perf_counter()
+        ranks, iterations = SOLVERS[name](
+            graph, damping_factor, tolerance, REFERENCE_ITERATIONS,
+            convergence=convergence
+        )
+        seconds = time.perf_counter() - start
+        results[name] = {
+            "iterations": iterations,
+            "seconds": seconds,
+            "ms_per_iteration": 1000 * convergence.elapsed / max(1, iterations),
+            "residual": convergence.error,
+            "error": sum(abs(a - b) for a, b in zip(ranks, reference))
+        }
+        if history:
+            results[name]["residuals"] = convergence.residuals
+            results[name]["times"] = convergence.times
+
+    accurate = [name for name in results if results[name]["error"] <= tolerance]
+    winner = min(accurate, key=lambda name: results[name]["seconds"], default=None)
+    return results, winner
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PageRank solvers.")
+    parser.add_argument("directory")
+    parser.add_argument("--damping", type=float, nargs="+", default=[DAMPING])
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--solver", nargs="+", choices=list(SOLVERS),
+                        default=list(SOLVERS), dest="solvers")
+    parser.add_argument("--history", action="store_true",
+                        help="include the residual and time of every iteration")
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    graph = crawl_graph(args.directory)
+    runs = []
+    for damping_factor in args.damping:
+        results, winner = compare(
+            graph, damping_factor, args.tolerance, args.solvers, args.history
+        )
+        runs.append({
+            "damping": damping_factor,
+            "winner": winner,
+            "solvers": results
+        })
+    text = json.dumps({
+        "directory": args.directory,
+        "pages": len(graph),
+        "links": len(graph.targets),
+        "tolerance": args.tolerance,
+        "runs": runs
+    }, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+Parallel crawler building a LinkGraph from a directory tree of HTML pages.
+
+Pages are found by walking the directory and its subdirectories and are
+named by their path relative to it, with "/" separators, so a flat corpus
+keeps its plain file names. Each page is read in fixed-size chunks and
+scanned for links as it streams in, so memory per page stays bounded, and
+pages are read concurrently by a thread pool, or a process pool when
+parsing rather than I/O is the bottleneck.
+
+The links found are cached in a binary file in the corpus directory with
+the size and mtime of each page, so later crawls only reparse the pages
+that were added or changed. The cache is an 8-byte magic, an 8-byte header
+length, a JSON header naming the pages and every link target, then the
+links as CSR arrays of indices into those names.
+"""
+
+import json
+import os
+import posixpath
+import re
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from linkgraph import LinkGraph
+
+LINK_PATTERN = re.compile(rb"<a\s+(?:[^>]*?)href=\"([^\"]*)\"")
+
+# The end of a chunk that LINK_PATTERN could still match from once more
+# of the page is read: an open "<a" tag, up to its href value if begun
+PARTIAL_LINK_PATTERN = re.compile(rb"<(?:a(?:\s[^>]*(?:href=\"[^\"]*)?)?)?\Z")
+
+# Longest link tag matched across a chunk boundary; a longer one split
+# between chunks is missed rather than held in memory
+MAX_TAG_LENGTH = 1 << 12
+
+# Bytes read from a page at a time
+CHUNK_SIZE = 1 << 16
+
+CACHE_NAME = ".links.cache"
+CACHE_MAGIC = b"PRLINKS1"
+
+
+def find_pages(directory):
+    """
+    Returns the relative paths of all .html files under `directory`,
+    in sorted order.
+    """
+    pages = []
+    for root, dirnames, filenames in os.walk(directory):
+        dirnames.sort()
+        prefix = os.path.relpath(root, directory)
+        for filename in sorted(filenames):
+            if filename.endswith(".html"):
+                path = filename if prefix == "." else os.path.join(prefix, filename)
+                pages.append(path.replace(os.sep, "/"))
+    return sorted(pages)
+
+
+def extract_links(path, chunk_size=CHUNK_SIZE):
+    """
+    Returns the set of href values of the <a> tags in the file at `path`,
+    reading it `chunk_size` bytes at a time.
+    """
+    links = set()
+    pending = b""
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            data = pending + chunk
+            end = 0
+            for match in LINK_PATTERN.finditer(data):
+                links.add(match.group(1).decode("utf-8", "replace"))
+                end = match.end()
+            if not chunk:
+                return links
+            pending = carry_over(data, end)
+
+
+def carry_over(data, start=0):
+    """
+    Returns the tail of `data` from `start` on that a link could continue
+    from in the next chunk: an "<a" tag still open at the end, or b"" if
+    there is none or it is longer than MAX_TAG_LENGTH. Other tags, however
+    long, are never carried.
+    """
+    match = PARTIAL_LINK_PATTERN.search(data, max(start, len(data) - MAX_TAG_LENGTH))
+    return data[match.start():] if match else b""
+
+
+def resolve_link(page, href):
+    """
+    Returns the corpus path a link on `page` points to, or None for links
+    that leave the corpus (absolute URLs, or paths above its root).
+    """
+    href = href.split("#", 1)[0].split("?", 1)[0]
+    if not href or ":" in href:
+        return None
+    if href.startswith("/"):
+        path = posixpath.normpath(href.lstrip("/"))
+    else:
+        path = posixpath.normpath(posixpath.join(posixpath.dirname(page), href))
+    return None if path.startswith("..") else path
+
+
+def page_links(page, path):
+    """
+    Returns the sorted corpus paths linked from `page`, read from `path`.
+    """
+    links = {resolve_link(page, href) for href in extract_links(path)}
+    links.discard(None)
+    return sorted(links)
+
+
+def _page_links(task):
+    return page_links(*task)
+
+
+def read_cache(path):
+    """
+    Returns a dictionary mapping each cached page to its (size, mtime,
+    links), or an empty dictionary if the cache is missing, unreadable,
+    truncated or corrupt.
+    """
+    try:
+        with open(path, "rb") as f:
+            if f.read(8) != CACHE_MAGIC:
+                return {}
+            length = int.from_bytes(f.read(8), "little")
+            header = json.loads(f.read(length).decode("utf-8"))
+            if header["byteorder"] != sys.byteorder:
+                return {}
+            offsets, targets = array("q"), array("i")
+            offsets.frombytes(f.read(offsets.itemsize * (len(header["pages"]) + 1)))
+            if len(offsets) != len(header["pages"]) + 1:
+                return {} ## Cut short
+            targets.fromfile(f, offsets[-1])
+
+        names = header["names"]
+        return {
+            names[name]: (size, mtime, [
+                names[target] for target in targets[offsets[i]:offsets[i + 1]]
+            ])
+            for i, (name, size, mtime) in enumerate(header["pages"])
+        }
+    except (OSError, ValueError, TypeError, IndexError, KeyError, EOFError):
+        return {}
+
+
+def write_cache(path, entries):
+    """
+    Writes `entries`, a dictionary shaped like the result of read_cache,
+    to `path`, replacing any previous cache atomically. The temporary
+    file is removed if the write fails.
+    """
+    names = {}
+    pages = []
+    offsets, targets = array("q", [0]), array("i")
+    for page, (size, mtime, links) in entries.items():
+        pages.append([names.setdefault(page, len(names)), size, mtime])
+        targets.extend(names.setdefault(link, len(names)) for link in links)
+        offsets.append(len(targets))
+    header = json.dumps({
+        "byteorder": sys.byteorder,
+        "names": list(names),
+        "pages": pages
+    }).encode("utf-8")
+
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as f:
+            f.write(CACHE_MAGIC)
+            f.write(len(header).to_bytes(8, "little"))
+            f.write(header)
+            offsets.tofile(f)
+            targets.tofile(f)
+        os.replace(temporary, path)
+    except BaseException:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+        raise
+
+
+def crawl_graph(directory, workers=None, processes=False, cache=True):
+    """
+    Returns a LinkGraph of the pages under `directory`, read by a pool
+    of `workers` threads, or worker processes with `processes`.
+    Links from a page to itself and to pages outside the corpus are dropped.
+
+    With `cache`, only pages whose size or mtime differ from the cache in
+    the directory are parsed, and the cache is rewritten if any were.
+    """
+    pages = find_pages(directory)
+    paths = [os.path.join(directory, *page.split("/")) for page in pages]
+    stamps = [(stat.st_size, stat.st_mtime_ns) for stat in map(os.stat, paths)]
+
+    cache_path = os.path.join(directory, CACHE_NAME)
+    cached = read_cache(cache_path) if cache else {}
+    links = {}
+    stale = []
+    for page, path, stamp in zip(pages, paths, stamps):
+        entry = cached.get(page)
+        if entry is not None and (entry[0], entry[1]) == stamp:
+            links[page] = entry[2]
+        else:
+            stale.append((page, path))
+
+    if stale:
+        executor_class = ProcessPoolExecutor if processes else ThreadPoolExecutor
+        with executor_class(max_workers=workers) as executor:
+            # Batches pages for process pools; thread pools ignore chunksize
+            chunksize = max(1, len(stale) // (4 * (workers or os.cpu_count() or 1)))
+            for (page, _), found in zip(
+                stale, executor.map(_page_links, stale, chunksize=chunksize)
+            ):
+                links[page] = found
+    # Rewrite the cache if pages were reparsed or removed
+    if cache and (stale or len(cached) != len(pages)):
+        try:
+            write_cache(cache_path, {
+                page: (*stamp, links[page]) for page, stamp in zip(pages, stamps)
+            })
+        except OSError:
+            pass ## A read-only corpus is crawled without a cache
+
+    index = {page: i for i, page in enumerate(pages)}
+    offsets, targets = array("i", [0]), array("i")
+    for i, page in enumerate(pages):
+        linked = {index.get(link) for link in links[page]}
+        linked.discard(None)
+        linked.discard(i)
+        targets.extend(sorted(linked))
+        offsets.append(len(targets))
+    return LinkGraph(pages, offsets, targets)
@@ -0,0 +1,173 @@
+"""
+Incremental PageRank after a few pages of a corpus change.
+
+PageRank with dangling pages spread evenly is, up to normalization, the
+solution of the linear system y = c + d * P^T y, where P follows the links
+of pages that have any and dangling pages simply lose their rank, and c is
+any constant page vector. Starting from the previous ranks, the residual
+of that system is a constant everywhere except at pages whose in-links
+changed, and a constant residual only rescales the solution. So the
+update pushes residual out from those pages until it is below tolerance
+everywhere, touching only the region the change reaches, and normalizes.
+"""
+
+import math
+from array import array
+from collections import deque
+
+from linkgraph import LinkGraph
+from pagerank import MAX_ITERATIONS, TOLERANCE, power_iteration
+
+# Above this fraction of pages affected, a warm-started power iteration
+# is cheaper than pushing residual page by page
+PUSH_LIMIT = 0.25
+
+# Most work spent pushing residual, in passes over the graph
+PUSH_PASSES = 1
+
+
+def apply_delta(graph, delta):
+    """
+    Returns a new LinkGraph with the pages in `delta` changed. `delta`
+    maps a page to the set of pages it now links to, or to None to remove
+    it. Pages not in the graph are added. Only pages in `delta` gain
+    links, so pages linking to an added page should be in `delta` too.
+    """
+    pages = sorted(
+        {page for page in graph.pages if page not in delta}
+        | {page for page, links in delta.items() if links is not None}
+    )
+    index = {page: i for i, page in enumerate(pages)}
+    offsets, targets = array("i", [0]), array("i")
+    for i, page in enumerate(pages):
+        if page in delta:
+            linked = {index.get(link) for link in delta[page]}
+        else:
+            old = graph.index[page]
+            linked = {index.get(graph.pages[link]) for link in graph.links(old)}
+        linked.discard(None)
+        linked.discard(i)
+        targets.extend(sorted(linked))
+        offsets.append(len(targets))
+    return LinkGraph(pages, offsets, targets)
+
+
+def full_iterations(damping_factor, tolerance):
+    """
+    Returns how many power iterations reach `tolerance` from the uniform
+    distribution at worst, when the error shrinks only by `damping_factor`
+    each time. Most graphs mix faster and need fewer.
+    """
+    return max(1, math.ceil(math.log(tolerance / 2) / math.log(damping_factor)))
+
+
+def update_pagerank(graph, ranks, delta, damping_factor, tolerance=TOLERANCE,
+                    max_iterations=MAX_ITERATIONS, baseline=None):
+    """
+    Updates `ranks`, the converged PageRank list of a LinkGraph, for the
+    changes in `delta` (see apply_delta). Returns (new_graph, new_ranks,
+    iterations_saved), where iterations_saved compares the work done, in
+    full passes over the graph, with `baseline`, the iterations a power
+    iteration from scratch takes, as returned with the previous ranks.
+    Without it, the baseline is estimated by full_iterations.
+
+    Residual is pushed for at most PUSH_PASSES passes' worth of links.
+    If the change has spread further than that, as it does on densely
+    connected graphs, the rest is left to a power iteration started
+    from the pushed ranks.
+    """
+    new_graph = apply_delta(graph, delta)
+    count = len(new_graph)
+    if count == 0:
+        return new_graph, [], 0
+
+    # The previous ranks carried over, with new pages starting at 0
+    warm = [0.0] * count
+    for page, rank in zip(graph.pages, ranks):
+        i = new_graph.index.get(page)
+        if i is not None:
+            warm[i] = rank
+
+    # Pages whose in-links changed: everything a changed or removed page
+    # linked to before or links to now, and the added pages themselves
+    affected = set()
+    for page in delta:
+        i = new_graph.index.get(page)
+        if i is not None:
+            affected.update(new_graph.links(i))
+            if page not in graph.index:
+                affected.add(i)
+        if page in graph.index:
+            old = graph.index[page]
+            affected.update(
+                new_graph.index[graph.pages[link]] for link in graph.links(old)
+                if graph.pages[link] in new_graph.index
+            )
+            # A removed page also drops out of the links of its sources,
+            # changing the share of everything those pages link to
+            if i is None:
+                for source in graph.linked_from(old):
+                    j = new_graph.index.get(graph.pages[source])
+                    if j is not None:
+                        affected.update(new_graph.links(j))
+
+    if baseline is None:
+        baseline = full_iterations(damping_factor, tolerance)
+    if len(affected) > PUSH_LIMIT * count:
+        # Added pages start at an even share, and the ranks must sum to 1
+        # or the power iteration spends its passes restoring the total
+        start = [rank or 1 / count for rank in warm]
+        total = sum(start)
+        new_ranks, iterations = power_iteration(
+            new_graph, damping_factor, tolerance, max_iterations,
+            ranks=[rank / total for rank in start]
+        )
+        return new_graph, new_ranks, baseline - iterations
+
+    # The constant term the previous ranks satisfied, dangling rank included
+    old_count = len(graph) or 1
+    dangling_rank = sum(ranks[i] for i in graph.dangling())
+    constant = (1 - damping_factor + damping_factor * dangling_rank) / old_count
+
+    offsets, targets = new_graph.offsets, new_graph.targets
+    outdegrees = new_graph.outdegrees()
+    residual = {}
+    work = 0
+    for i in affected:
+        sources = new_graph.linked_from(i)
+        inflow = sum(warm[j] / outdegrees[j] for j in sources)
+        residual[i] = constant + damping_factor * inflow - warm[i]
+        work += len(sources) + 1
+
+    threshold = tolerance * (1 - damping_factor) / count
+    queue = deque(i for i in residual if abs(residual[i]) > threshold)
+    queued = set(queue)
+    size = len(targets) + count
+    limit = PUSH_PASSES * size
+    while queue and work < limit:
+        i = queue.popleft()
+        queued.discard(i)
+        amount = residual.pop(i)
+        warm[i] += amount
+        degree = outdegrees[i]
+        work += degree + 1
+        if not degree:
+            continue
+        share = damping_factor * amount / degree
+        for k in range(offsets[i], offsets[i + 1]):
+            j = targets[k]
+            value = residual.get(j, 0.0) + share
+            residual[j] = value
+            if abs(value) > threshold and j not in queued:
+                queue.append(j)
+                queued.add(j)
+
+    total = sum(warm)
+    new_ranks = [rank / total for rank in warm]
+    iterations = work / size
+    if queue:
+        new_ranks, passes = power_iteration(
+            new_graph, damping_factor, tolerance, max_iterations, ranks=new_ranks
+        )
+        iterations += passes
+    return new_graph, new_ranks, baseline - iterations
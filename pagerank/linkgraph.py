@@ -0,0 +1,99 @@
+"""
+Compressed sparse row (CSR) link graph for PageRank.
+
+Pages are numbered 0..n-1. The links of page i are
+targets[offsets[i]:offsets[i + 1]], and the transposed graph, the pages
+linking to i, is sources[in_offsets[i]:in_offsets[i + 1]]. Both are flat
+`array("i")` buffers, so a graph with millions of links costs a few bytes
+per link instead of a Python set entry.
+"""
+
+from array import array
+
+
+class LinkGraph():
+    """
+    Pages and the links between them, in both directions.
+    """
+
+    def __init__(self, pages, offsets, targets):
+        self.pages = pages
+        self.offsets = offsets
+        self.targets = targets
+        self.index = {page: i for i, page in enumerate(pages)}
+        self.in_offsets, self.sources = transpose(len(pages), offsets, targets)
+
+    @classmethod
+    def from_corpus(cls, corpus):
+        """
+        Builds a graph from a dictionary mapping each page to the set of
+        pages it links to, as returned by `crawl`. Links to pages outside
+        the corpus are dropped.
+        """
+        pages = sorted(corpus)
+        index = {page: i for i, page in enumerate(pages)}
+        offsets, targets = array("i", [0]), array("i")
+        for page in pages:
+            targets.extend(sorted(
+                index[link] for link in corpus[page] if link in index
+            ))
+            offsets.append(len(targets))
+        return cls(pages, offsets, targets)
+
+    def __len__(self):
+        return len(self.pages)
+
+    def links(self, i):
+        """
+        Returns the page numbers that page i links to.
+        """
+        return self.targets[self.offsets[i]:self.offsets[i + 1]]
+
+    def linked_from(self, i):
+        """
+        Returns the page numbers that link to page i.
+        """
+        return self.sources[self.in_offsets[i]:self.in_offsets[i + 1]]
+
+    def outdegrees(self):
+        """
+        Returns the number of links of each page.
+        """
+        offsets = self.offsets
+        return array("i", map(int.__sub__, offsets[1:], offsets[:-1]))
+
+    def dangling(self):
+        """
+        Returns the page numbers of pages with no links.
+        """
+        offsets = self.offsets
+        return array("i", (
+            i for i in range(len(self.pages)) if offsets[i] == offsets[i + 1]
+        ))
+
+    def to_dict(self, values):
+        """
+        Returns a dictionary mapping each page name to its value.
+        """
+        return dict(zip(self.pages, values))
+
+
+def transpose(count, offsets, targets):
+    """
+    Returns (in_offsets, sources), the CSR of the reversed links,
+    built with a counting sort so each row stays in source order.
+    """
+    in_offsets = array("i", bytes(4 * (count + 1)))
+    for target in targets:
+        in_offsets[target + 1] += 1
+    for i in range(count):
+        in_offsets[i + 1] += in_offsets[i]
+
+    cursor = array("i", in_offsets[:-1])
+    sources = array("i", bytes(4 * len(targets)))
+    for source in range(count):
+        for k in range(offsets[source], offsets[source + 1]):
+            target = targets[k]
+            sources[cursor[target]] = source
+            cursor[target] += 1
+    return in_offsets, sources
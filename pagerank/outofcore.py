@@ -0,0 +1,239 @@
+"""
+Out-of-core PageRank for link graphs larger than memory.
+
+The links are written to an edge file sorted by target, so the pages
+linking to each page are contiguous, in the same CSR layout as
+LinkGraph.sources. Links are collected in runs of RUN_EDGES, each sorted
+and spilled to a temporary file, and the runs are merged into the edge
+file, so building it needs memory for one run rather than every link.
+
+Power iteration then maps the edge file and streams it a block of
+BLOCK_PAGES target pages at a time. Only the rank vectors, the
+outdegrees and the page offsets stay resident, all flat arrays of
+O(pages) size, while the O(links) sources are paged in and dropped
+by the operating system as the blocks go by.
+
+The edge file is an 8-byte magic, the page and link counts as 8-byte
+integers, the sources as 4-byte integers (padded to 8 bytes), the
+in-link offsets as 8-byte integers and the outdegrees as 4-byte integers,
+all in native byte order. Page names go in a text file beside it.
+"""
+
+import heapq
+import mmap
+import operator
+import os
+import sys
+import tempfile
+from array import array
+
+from crawler import find_pages, page_links
+from pagerank import DAMPING, MAX_ITERATIONS, TOLERANCE
+
+EDGES_MAGIC = b"PREDGES1"
+
+# Links sorted in memory at a time while writing an edge file
+RUN_EDGES = 1 << 20
+
+# Items read from each run at a time while merging them
+MERGE_CHUNK = 1 << 14
+
+# Target pages summed per block of a streamed power iteration
+BLOCK_PAGES = 1 << 14
+
+
+def _read_run(f):
+    """
+    Yields the keys of a sorted run file a chunk at a time.
+    """
+    f.seek(0)
+    while True:
+        chunk = array("q")
+        try:
+            chunk.fromfile(f, MERGE_CHUNK)
+        except EOFError:
+            pass
+        if not chunk:
+            return
+        yield from chunk
+
+
+def write_edges(path, count, links, run_edges=RUN_EDGES):
+    """
+    Writes an edge file of `count` pages to `path` from `links`, an
+    iterable of (source, target) page number pairs. Duplicate links and
+    links from a page to itself are dropped.
+    """
+    outdegrees = array("i", bytes(4 * count))
+    in_offsets = array("q", bytes(8 * (count + 1)))
+    runs = []
+    run = array("q")
+
+    def spill():
+        f = tempfile.TemporaryFile()
+        array("q", sorted(set(run))).tofile(f)
+        runs.append(f)
+        del run[:]
+
+    try:
+        for source, target in links:
+            if source != target:
+                # Sorting these keys sorts by target, then source
+                run.append(target * count + source)
+                if len(run) >= run_edges:
+                    spill()
+        if run:
+            spill()
+
+        edges = 0
+        previous = -1
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as out:
+            out.write(EDGES_MAGIC)
+            out.write(bytes(16))
+            sources = array("i")
+            for key in heapq.merge(*map(_read_run, runs)):
+                if key == previous:
+                    continue
+                previous = key
+                target, source = divmod(key, count)
+                sources.append(source)
+                outdegrees[source] += 1
+                in_offsets[target + 1] += 1
+                if len(sources) >= MERGE_CHUNK:
+                    edges += len(sources)
+                    sources.tofile(out)
+                    sources = array("i")
+            edges += len(sources)
+            sources.tofile(out)
+            if edges % 2:
+                out.write(bytes(4))
+            for i in range(count):
+                in_offsets[i + 1] += in_offsets[i]
+            in_offsets.tofile(out)
+            outdegrees.tofile(out)
+            out.seek(len(EDGES_MAGIC))
+            out.write(count.to_bytes(8, sys.byteorder))
+            out.write(edges.to_bytes(8, sys.byteorder))
+        os.replace(temporary, path)
+    finally:
+        for f in runs:
+            f.close()
+
+
+def crawl_edges(directory, path, run_edges=RUN_EDGES):
+    """
+    Crawls the pages under `directory` one at a time into an edge file at
+    `path`, and writes their names, one per line, to `path` + ".pages".
+    Returns the list of page names.
+    """
+    pages = find_pages(directory)
+    index = {page: i for i, page in enumerate(pages)}
+
+    def links():
+        for source, page in enumerate(pages):
+            location = os.path.join(directory, *page.split("/"))
+            for link in page_links(page, location):
+                target = index.get(link)
+                if target is not None:
+                    yield source, target
+
+    write_edges(path, len(pages), links(), run_edges)
+    with open(path + ".pages", "w", encoding="utf-8") as f:
+        f.writelines(page + "\n" for page in pages)
+    return pages
+
+
+class EdgeFile():
+    """
+    A memory-mapped edge file. Use as a context manager, or call close.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            if f.read(len(EDGES_MAGIC)) != EDGES_MAGIC:
+                raise ValueError(f"{path} is not an edge file")
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = view = memoryview(self.map)
+        self.count = int.from_bytes(view[8:16], sys.byteorder)
+        self.edges = int.from_bytes(view[16:24], sys.byteorder)
+        start = 24
+        end = start + 4 * self.edges
+        self.sources = view[start:end].cast("i")
+        start = end + 4 * (self.edges % 2)
+        end = start + 8 * (self.count + 1)
+        self.in_offsets = view[start:end].cast("q")
+        self.outdegrees = view[end:end + 4 * self.count].cast("i")
+
+    def close(self):
+        self.sources.release()
+        self.in_offsets.release()
+        self.outdegrees.release()
+        self.view.release()
+        self.map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def stream_pagerank(path, damping_factor, tolerance=TOLERANCE,
+                    max_iterations=MAX_ITERATIONS, block_pages=BLOCK_PAGES):
+    """
+    Runs power iteration over the edge file at `path`, streaming its
+    sources a block of `block_pages` target pages at a time, and returns
+    (ranks, iterations) with ranks as an array indexed by page number.
+    Converges like pagerank.power_iteration.
+    """
+    with EdgeFile(path) as edges:
+        count = edges.count
+        if count == 0:
+            return array("d"), 0
+        sources, in_offsets = edges.sources, edges.in_offsets
+        outdegrees = edges.outdegrees
+        inverse = array("d", (1 / degree if degree else 0.0 for degree in outdegrees))
+        dangling = array("i", (i for i, degree in enumerate(outdegrees) if not degree))
+        teleport = (1 - damping_factor) / count
+        ranks = array("d", [1 / count]) * count
+        new_ranks = array("d", bytes(8 * count))
+
+        iterations = 0
+        while iterations < max_iterations:
+            iterations += 1
+            shares = array("d", map(operator.mul, ranks, inverse))
+            get = shares.__getitem__
+            base = teleport + damping_factor * sum(map(ranks.__getitem__, dangling)) / count
+            for first in range(0, count, block_pages):
+                last = min(count, first + block_pages)
+                begin = in_offsets[first]
+                block = sources[begin:in_offsets[last]]
+                bounds = in_offsets[first:last + 1].tolist()
+                new_ranks[first:last] = array("d", (
+                    base + damping_factor * sum(map(get, block[start - begin:end - begin]))
+                    for start, end in zip(bounds[:-1], bounds[1:])
+                ))
+                block.release()
+            change = sum(map(abs, map(operator.sub, new_ranks, ranks)))
+            ranks, new_ranks = new_ranks, ranks
+            if change < tolerance:
+                break
+
+    total = sum(ranks)
+    return array("d", (rank / total for rank in ranks)), iterations
+
+
+def main():
+    if len(sys.argv) != 3:
+        sys.exit("Usage: python outofcore.py corpus edgefile")
+    directory, path = sys.argv[1:]
+    pages = crawl_edges(directory, path)
+    ranks, iterations = stream_pagerank(path, DAMPING)
+    print(f"PageRank Results from Streamed Iteration ({iterations} iterations)")
+    for page, rank in sorted(zip(pages, ranks)):
+        print(f"  {page}: {rank:.4f}")
+
+
+if __name__ == "__main__":
+    main()
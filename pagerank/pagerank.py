@@ -1,17 +1,35 @@
-import os
+import collections
+import multiprocessing
+import operator
 import random
-import re
 import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from crawler import crawl_graph
+from linkgraph import LinkGraph
+from solvers import aitken, gauss_seidel, gmres, pagerank_residual, quadratic
 
 DAMPING = 0.85
 SAMPLES = 10000
 
+# Random surfers advanced together by sample_pagerank
+WALKERS = 1000
+
+# Iteration stops once the ranks change by less than TOLERANCE in total
+TOLERANCE = 0.001
+MAX_ITERATIONS = 1000
+
 
 def main():
     if len(sys.argv) != 2:
         sys.exit("Usage: python pagerank.py corpus")
     corpus = crawl(sys.argv[1])
+    start = time.perf_counter()
     ranks = sample_pagerank(corpus, DAMPING, SAMPLES)
+    elapsed = time.perf_counter() - start
+    print(f"Sampled {SAMPLES / elapsed:,.0f} steps per second", file=sys.stderr)
     print(f"PageRank Results from Sampling (n = {SAMPLES})")
     for page in sorted(ranks):
         print(f"  {page}: {ranks[page]:.4f}")
@@ -26,26 +44,14 @@ def crawl(directory):
     Parse a directory of HTML pages and check for links to other pages.
     Return a dictionary where each key is a page, and values are
     a list of all other pages in the corpus that are linked to by the page.
-    """
-    pages = dict()
 
-    # Extract all links from HTML files
-    for filename in os.listdir(directory):
-        if not filename.endswith(".html"):
-            continue
-        with open(os.path.join(directory, filename)) as f:
-            contents = f.read()
-            links = re.findall(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"", contents)
-            pages[filename] = set(links) - {filename}
-
-    # Only include links to other pages in the corpus
-    for filename in pages:
-        pages[filename] = set(
-            link for link in pages[filename]
-            if link in pages
-        )
-
-    return pages
+    Pages in subdirectories are included, named by their relative path.
+    """
+    graph = crawl_graph(directory)
+    return {
+        page: {graph.pages[link] for link in graph.links(i)}
+        for i, page in enumerate(graph.pages)
+    }
 
 
 def transition_model(corpus, page, damping_factor):
@@ -57,10 +63,18 @@ def transition_model(corpus, page, damping_factor):
     linked to by `page`. With probability `1 - damping_factor`, choose
     a link at random chosen from all pages in the corpus.
     """
-    raise NotImplementedError
+    links = corpus[page]
+    if not links:
+        return {other: 1 / len(corpus) for other in corpus}
+    teleport = (1 - damping_factor) / len(corpus)
+    model = {other: teleport for other in corpus}
+    for link in links:
+        model[link] += damping_factor / len(links)
+    return model
 
 
-def sample_pagerank(corpus, damping_factor, n):
+def sample_pagerank(corpus, damping_factor, n, seed=None, walkers=WALKERS,
+                    processes=None):
     """
     Return PageRank values for each page by sampling `n` pages
     according to transition model, starting with a page at random.
@@ -68,11 +82,146 @@ def sample_pagerank(corpus, damping_factor, n):
     Return a dictionary where keys are page names, and values are
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
+
+    The samples are split across `walkers` random surfers advanced
+    together, each starting at a random page. The same `seed` and
+    `walkers` give the same estimate.
+
+    With `processes`, the samples and walkers are split across that many
+    worker processes instead (see parallel_visits), and the same `seed`,
+    `walkers` and `processes` give the same estimate.
+    """
+    if n <= 0:
+        raise ValueError(f"Number of samples must be positive, got {n}")
+    graph = LinkGraph.from_corpus(corpus)
+    if not len(graph):
+        return {}
+    if processes:
+        counts = parallel_visits(graph, damping_factor, n, seed, walkers, processes)
+    else:
+        counts = sample_visits(graph, damping_factor, n, random.Random(seed), walkers)
+    return graph.to_dict(count / n for count in counts)
+
+
+def sample_visits(graph, damping_factor, n, rng, walkers=WALKERS):
+    """
+    Draws `n` samples of the random surfer over a LinkGraph, split across
+    `walkers` walks advanced a step at a time, and returns how many times
+    each page was visited as a list indexed by page number.
+    """
+    return walk_visits(graph.offsets, graph.targets, damping_factor, n, rng, walkers)
+
+
+def walk_visits(offsets, targets, damping_factor, n, rng, walkers=WALKERS):
+    """
+    sample_visits over a graph given only by its CSR `offsets` and
+    `targets`, as worker processes receive it. An empty graph, or no
+    samples, visits nothing.
+    """
+    count = len(offsets) - 1
+    if count == 0 or n <= 0:
+        return [0] * count
+    walkers = max(1, min(walkers, n))
+    degrees = array("i", map(int.__sub__, offsets[1:], offsets[:-1]))
+    random_float = rng.random
+
+    # Walker w draws `steps` samples, plus one more if w < extra
+    steps, extra = divmod(n, walkers)
+    positions = [int(random_float() * count) for _ in range(walkers)]
+    visits = collections.Counter(positions)
+    for step in range(1, steps + (extra > 0)):
+        if step == steps:
+            del positions[extra:]
+        for w, page in enumerate(positions):
+            u = random_float()
+            degree = degrees[page]
+            if u < damping_factor and degree:
+                # u / damping_factor is uniform on [0, 1) like a fresh draw
+                link = min(degree - 1, int(u / damping_factor * degree))
+                positions[w] = targets[offsets[page] + link]
+            else:
+                positions[w] = int(random_float() * count)
+        visits.update(positions)
+    return [visits[page] for page in range(count)]
+
+
+def worker_seed(seed, worker):
+    """
+    Returns the seed of a worker's random stream. String seeds are hashed
+    with SHA-512, so each worker's stream is independent of the others
+    and the same on every platform and run.
+    """
+    return f"{seed}/{worker}"
+
+
+# Set in each worker process by _start_sampler
+_sampler = None
+
+
+def _start_sampler(offsets, targets, shared):
+    global _sampler
+    _sampler = offsets, targets, shared
+
+
+def _sample_worker(task):
     """
-    raise NotImplementedError
+    Samples one worker's share of the walks and writes its visit counts
+    into its own row of the shared counts.
+    """
+    worker, damping_factor, n, seed, walkers = task
+    offsets, targets, shared = _sampler
+    count = len(offsets) - 1
+    visits = walk_visits(
+        offsets, targets, damping_factor, n, random.Random(seed), walkers
+    )
+    rows = memoryview(shared).cast("B").cast("q")
+    rows[worker * count:(worker + 1) * count] = array("q", visits)
+    rows.release()
+
 
+def parallel_visits(graph, damping_factor, n, seed=None, walkers=WALKERS,
+                    processes=None):
+    """
+    sample_visits split across a pool of `processes` worker processes,
+    each drawing about n / processes samples with walkers / processes
+    walks from its own random stream seeded by worker_seed.
 
-def iterate_pagerank(corpus, damping_factor):
+    Every worker writes its counts to its own row of a shared array, and
+    the rows are summed once all are done. Counts are integers, so the
+    result depends only on `seed`, `walkers` and `processes`, never on
+    which worker finished first. With no `seed`, a random one is drawn.
+    """
+    count = len(graph)
+    processes = max(1, min(processes or multiprocessing.cpu_count(), n))
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    shared = multiprocessing.RawArray("q", count * processes)
+
+    tasks = []
+    for worker in range(processes):
+        samples = n // processes + (worker < n % processes)
+        share = walkers // processes + (worker < walkers % processes)
+        tasks.append((worker, damping_factor, samples,
+                      worker_seed(seed, worker), max(1, share)))
+    with ProcessPoolExecutor(
+        max_workers=processes, initializer=_start_sampler,
+        initargs=(graph.offsets, graph.targets, shared)
+    ) as executor:
+        list(executor.map(_sample_worker, tasks))
+
+    rows = memoryview(shared).cast("B").cast("q")
+    totals = [0] * count
+    for worker in range(processes):
+        row = rows[worker * count:(worker + 1) * count]
+        totals = list(map(operator.add, totals, row))
+        row.release()
+    rows.release()
+    return totals
+
+
+def iterate_pagerank(corpus, damping_factor, tolerance=TOLERANCE,
+                     max_iterations=MAX_ITERATIONS, solver="power",
+                     convergence=None):
     """
     Return PageRank values for each page by iteratively updating
     PageRank values until convergence.
@@ -80,8 +229,79 @@ def iterate_pagerank(corpus, damping_factor):
     Return a dictionary where keys are page names, and values are
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
+
+    Iteration stops when the ranks change by less than `tolerance` in
+    total (so no single rank changes by more), or after `max_iterations`.
+
+    `solver` names one of SOLVERS, and a solvers.Convergence passed as
+    `convergence` records its residuals, timings and final error.
+    """
+    if solver not in SOLVERS:
+        raise ValueError(f"Unknown solver {solver!r}, expected one of {list(SOLVERS)}")
+    graph = LinkGraph.from_corpus(corpus)
+    ranks, _ = SOLVERS[solver](
+        graph, damping_factor, tolerance, max_iterations, convergence=convergence
+    )
+    return graph.to_dict(ranks)
+
+
+def power_iteration(graph, damping_factor, tolerance=TOLERANCE,
+                    max_iterations=MAX_ITERATIONS, ranks=None, convergence=None):
+    """
+    Runs PageRank power iteration over a LinkGraph, starting from `ranks`
+    or the uniform distribution, and returns (ranks, iterations) with
+    ranks as a list indexed by page number.
+
+    A page with no links is treated as linking to every page, itself
+    included, so its rank is spread evenly over the corpus.
+
+    A solvers.Convergence passed as `convergence` records the change
+    of every iteration, its time and the error of the final ranks.
     """
-    raise NotImplementedError
+    count = len(graph)
+    if count == 0:
+        return [], 0
+    if ranks is None:
+        ranks = [1 / count] * count
+
+    # Dividing by an infinite outdegree makes dangling pages contribute 0
+    outdegrees = [degree or float("inf") for degree in graph.outdegrees()]
+    dangling = graph.dangling()
+    sources, in_offsets = graph.sources, graph.in_offsets
+    rows = list(zip(in_offsets[:-1], in_offsets[1:]))
+    teleport = (1 - damping_factor) / count
+
+    iterations = 0
+    started = time.perf_counter()
+    while iterations < max_iterations:
+        iterations += 1
+        shares = list(map(operator.truediv, ranks, outdegrees))
+        base = teleport + damping_factor * sum(map(ranks.__getitem__, dangling)) / count
+        new_ranks = [
+            base + damping_factor * sum(map(shares.__getitem__, sources[start:end]))
+            for start, end in rows
+        ]
+        change = sum(map(abs, map(operator.sub, new_ranks, ranks)))
+        ranks = new_ranks
+        if convergence is not None:
+            started = convergence.record(change, started)
+        if change < tolerance:
+            break
+
+    total = sum(ranks)
+    ranks = [rank / total for rank in ranks]
+    if convergence is not None:
+        convergence.error = pagerank_residual(graph, damping_factor, ranks)
+    return ranks, iterations
+
+
+SOLVERS = {
+    "power": power_iteration,
+    "gauss-seidel": gauss_seidel,
+    "aitken": aitken,
+    "quadratic": quadratic,
+    "gmres": gmres,
+}
 
 
 if __name__ == "__main__":
@@ -0,0 +1,335 @@
+"""
+Alternative PageRank solvers for a LinkGraph, with convergence records.
+
+Power iteration shrinks its error by about the damping factor each pass,
+which gets slow as it approaches 1. These solvers reach the same ranks
+with fewer passes:
+
+- gauss_seidel sweeps the linear system (I - d P^T) y = 1 in page order,
+  using each updated rank as soon as it is known. P follows the links of
+  pages that have any, and normalizing y gives PageRank with dangling
+  pages spread evenly.
+- aitken and quadratic run power iteration and, every EXTRAPOLATE_EVERY
+  passes, jump ahead with Aitken's delta-squared process per page or with
+  quadratic extrapolation over the last four iterates.
+- gmres solves the same linear system with restarted GMRES, building a
+  Krylov basis of up to RESTART vectors between restarts.
+
+Each solver has the signature of pagerank.power_iteration and returns
+(ranks, iterations). Passed a Convergence, it records the residual and
+time of every iteration and the error of the final ranks.
+"""
+
+import math
+import operator
+import time
+
+# Power iterations between extrapolations, and before the first
+EXTRAPOLATE_EVERY = 10
+
+# Krylov basis size of gmres before it restarts
+RESTART = 20
+
+
+class Convergence():
+    """
+    The progress of one solver run. residuals holds each iteration's
+    convergence measure: the L1 change of the normalized ranks, or the
+    relative residual norm |b - Ay| / |b| for gmres. error is the L1 norm
+    of G x - x for the final ranks x and the PageRank matrix G, the same
+    measure for every solver.
+    """
+    __slots__ = ("solver", "residuals", "times", "error")
+
+    def __init__(self, solver):
+        self.solver = solver
+        self.residuals = []
+        self.times = [] ## Seconds per iteration
+        self.error = None
+
+    def record(self, residual, started):
+        """
+        Records an iteration begun at perf_counter time `started`,
+        and returns the time it ended.
+        """
+        now = time.perf_counter()
+        self.residuals.append(residual)
+        self.times.append(now - started)
+        return now
+
+    @property
+    def iterations(self):
+        return len(self.residuals)
+
+    @property
+    def elapsed(self):
+        return sum(self.times)
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return (f"Convergence({self.solver}: {self.iterations} iterations, "
+                f"{self.elapsed:.4f}s, error {self.error:.3g})")
+
+
+def _rows(graph):
+    """
+    Returns the sources of each page as a list of arrays, and the inverse
+    outdegree of each page, 0 for dangling pages.
+    """
+    sources, in_offsets = graph.sources, graph.in_offsets
+    rows = [sources[start:end] for start, end in zip(in_offsets[:-1], in_offsets[1:])]
+    inverse = [1 / degree if degree else 0.0 for degree in graph.outdegrees()]
+    return rows, inverse
+
+
+def _propagate(rows, inverse, damping_factor, vector):
+    """
+    Returns d P^T vector: the part of each page's value that flows along
+    its links, summed at every page.
+    """
+    get = list(map(operator.mul, vector, inverse)).__getitem__
+    return [damping_factor * sum(map(get, row)) for row in rows]
+
+
+def _normalized(values):
+    total = sum(values)
+    return [value / total for value in values]
+
+
+def _change(new, old):
+    return sum(map(abs, map(operator.sub, new, old)))
+
+
+def pagerank_residual(graph, damping_factor, ranks, rows=None, inverse=None):
+    """
+    Returns the L1 norm of G x - x for ranks x summing to 1, where G is
+    the PageRank matrix with dangling pages spread evenly.
+    """
+    if rows is None:
+        rows, inverse = _rows(graph)
+    count = len(graph)
+    lost = sum(ranks[i] for i in graph.dangling())
+    base = (1 - damping_factor + damping_factor * lost) / count
+    flow = _propagate(rows, inverse, damping_factor, ranks)
+    return sum(abs(base + f - x) for f, x in zip(flow, ranks))
+
+
+def _start(graph, ranks):
+    count = len(graph)
+    return [1 / count] * count if ranks is None else list(ranks)
+
+
+def _finish(graph, damping_factor, ranks, convergence, rows, inverse):
+    ranks = _normalized(ranks)
+    if convergence is not None:
+        convergence.error = pagerank_residual(
+            graph, damping_factor, ranks, rows, inverse
+        )
+    return ranks
+
+
+def gauss_seidel(graph, damping_factor, tolerance, max_iterations,
+                 ranks=None, convergence=None):
+    """
+    Solves for PageRank with Gauss-Seidel sweeps, stopping when a sweep
+    changes the normalized ranks by less than `tolerance` in total.
+    """
+    count = len(graph)
+    if count == 0:
+        return [], 0
+    rows, inverse = _rows(graph)
+    y = [rank * count for rank in _start(graph, ranks)]
+    # Each page's value divided by its outdegree, kept current in the sweep
+    shares = list(map(operator.mul, y, inverse))
+    get = shares.__getitem__
+    previous = _normalized(y)
+
+    iterations = 0
+    started = time.perf_counter()
+    while iterations < max_iterations:
+        iterations += 1
+        for i, row in enumerate(rows):
+            value = 1 + damping_factor * sum(map(get, row))
+            y[i] = value
+            shares[i] = value * inverse[i]
+        current = _normalized(y)
+        change = _change(current, previous)
+        previous = current
+        if convergence is not None:
+            started = convergence.record(change, started)
+        if change < tolerance:
+            break
+    return _finish(graph, damping_factor, y, convergence, rows, inverse), iterations
+
+
+def _aitken(x0, x1, x2):
+    """
+    Extrapolates each page's limit from three iterates with Aitken's
+    delta-squared process, keeping the last iterate where it breaks down.
+    """
+    result = []
+    for a, b, c in zip(x0, x1, x2):
+        second = c - 2 * b + a
+        value = c - (c - b) ** 2 / second if second else c
+        result.append(value if value > 0 else c)
+    return result
+
+
+def _quadratic(x0, x1, x2, x3):
+    """
+    Extrapolates the limit from four iterates by fitting the quadratic
+    their differences satisfy when the error lies in the span of the
+    second and third eigenvectors.
+    """
+    y1 = list(map(operator.sub, x1, x0))
+    y2 = list(map(operator.sub, x2, x0))
+    y3 = list(map(operator.sub, x3, x0))
+    # Least squares for [y1 y2] g = -y3 through the 2x2 normal equations
+    a11 = sum(map(operator.mul, y1, y1))
+    a12 = sum(map(operator.mul, y1, y2))
+    a22 = sum(map(operator.mul, y2, y2))
+    b1 = -sum(map(operator.mul, y1, y3))
+    b2 = -sum(map(operator.mul, y2, y3))
+    determinant = a11 * a22 - a12 * a12
+    if not determinant:
+        return x3
+    g1 = (b1 * a22 - b2 * a12) / determinant
+    g2 = (a11 * b2 - a12 * b1) / determinant
+    beta0, beta1, beta2 = g1 + g2 + 1, g2 + 1, 1
+    result = [
+        beta0 * a + beta1 * b + beta2 * c for a, b, c in zip(x1, x2, x3)
+    ]
+    return result if min(result) > 0 else x3
+
+
+def _extrapolated(graph, damping_factor, tolerance, max_iterations,
+                  ranks, convergence, extrapolate, window):
+    count = len(graph)
+    if count == 0:
+        return [], 0
+    rows, inverse = _rows(graph)
+    dangling = graph.dangling()
+    teleport = (1 - damping_factor) / count
+    ranks = _start(graph, ranks)
+    history = [ranks]
+
+    iterations = 0
+    started = time.perf_counter()
+    while iterations < max_iterations:
+        iterations += 1
+        base = teleport + damping_factor * sum(ranks[i] for i in dangling) / count
+        new_ranks = [
+            base + flow
+            for flow in _propagate(rows, inverse, damping_factor, ranks)
+        ]
+        history = history[1 - window:] + [new_ranks]
+        if iterations % EXTRAPOLATE_EVERY == 0 and len(history) == window:
+            new_ranks = _normalized(extrapolate(*history))
+            history = [new_ranks]
+        change = _change(new_ranks, ranks)
+        ranks = new_ranks
+        if convergence is not None:
+            started = convergence.record(change, started)
+        if change < tolerance:
+            break
+    return _finish(graph, damping_factor, ranks, convergence, rows, inverse), iterations
+
+
+def aitken(graph, damping_factor, tolerance, max_iterations,
+           ranks=None, convergence=None):
+    """
+    Power iteration with periodic Aitken extrapolation, stopping when an
+    iteration changes the ranks by less than `tolerance` in total.
+    """
+    return _extrapolated(graph, damping_factor, tolerance, max_iterations,
+                         ranks, convergence, _aitken, 3)
+
+
+def quadratic(graph, damping_factor, tolerance, max_iterations,
+              ranks=None, convergence=None):
+    """
+    Power iteration with periodic quadratic extrapolation, stopping when
+    an iteration changes the ranks by less than `tolerance` in total.
+    """
+    return _extrapolated(graph, damping_factor, tolerance, max_iterations,
+                         ranks, convergence, _quadratic, 4)
+
+
+def gmres(graph, damping_factor, tolerance, max_iterations,
+          ranks=None, convergence=None):
+    """
+    Solves (I - d P^T) y = 1 with GMRES restarted every RESTART steps,
+    stopping when the relative residual falls below `tolerance`. Each
+    iteration is one Krylov step, a single product with the graph.
+    """
+    count = len(graph)
+    if count == 0:
+        return [], 0
+    rows, inverse = _rows(graph)
+
+    def apply(vector):
+        flow = _propagate(rows, inverse, damping_factor, vector)
+        return list(map(operator.sub, vector, flow))
+
+    def dot(u, v):
+        return sum(map(operator.mul, u, v))
+
+    y = [rank * count for rank in _start(graph, ranks)]
+    b_norm = math.sqrt(count)
+    iterations = 0
+    started = time.perf_counter()
+    while iterations < max_iterations:
+        r = [1 - value for value in apply(y)]
+        beta = math.sqrt(dot(r, r))
+        if beta / b_norm < tolerance:
+            break
+        # Arnoldi with modified Gram-Schmidt, with the Hessenberg least
+        # squares problem kept triangular by Givens rotations
+        basis = [[value / beta for value in r]]
+        hessenberg = []
+        rotations = []
+        g = [beta]
+        for k in range(min(RESTART, max_iterations - iterations)):
+            iterations += 1
+            w = apply(basis[k])
+            column = []
+            for v in basis:
+                h = dot(w, v)
+                column.append(h)
+                w = [a - h * c for a, c in zip(w, v)]
+            norm = math.sqrt(dot(w, w))
+            column.append(norm)
+            for j, (c, s) in enumerate(rotations):
+                column[j], column[j + 1] = (
+                    c * column[j] + s * column[j + 1],
+                    -s * column[j] + c * column[j + 1]
+                )
+            radius = math.hypot(column[k], column[k + 1])
+            c, s = column[k] / radius, column[k + 1] / radius
+            rotations.append((c, s))
+            column[k], column[k + 1] = radius, 0.0
+            g.append(-s * g[k])
+            g[k] *= c
+            hessenberg.append(column)
+            residual = abs(g[k + 1]) / b_norm
+            if convergence is not None:
+                started = convergence.record(residual, started)
+            if residual < tolerance or not norm:
+                break
+            basis.append([value / norm for value in w])
+
+        # Back substitution for the basis coefficients, then update y
+        size = len(hessenberg)
+        coefficients = [0.0] * size
+        for i in reversed(range(size)):
+            total = g[i] - sum(
+                hessenberg[j][i] * coefficients[j] for j in range(i + 1, size)
+            )
+            coefficients[i] = total / hessenberg[i][i]
+        for coefficient, v in zip(coefficients, basis):
+            y = [a + coefficient * c for a, c in zip(y, v)]
+        if residual < tolerance or not norm:
+            break
+    return _finish(graph, damping_factor, y, convergence, rows, inverse), iterations
@@ -0,0 +1,29 @@
+from crawler import MAX_TAG_LENGTH, carry_over, extract_links
+
+
+def write_page(tmp_path, data):
+    path = tmp_path / "page.html"
+    path.write_bytes(data)
+    return path
+
+
+def test_long_non_link_tag_is_not_carried(tmp_path):
+    tag = b'<img src="data:image/png;base64,' + b"A" * 4096 + b'">'
+    page = b'<a href="before.html">' + tag + b'<a href="after.html">'
+    path = write_page(tmp_path, page)
+
+    assert extract_links(path, chunk_size=64) == {"before.html", "after.html"}
+    # Cut anywhere past its "<i", nothing of the image tag is carried over
+    for cut in range(24, 22 + len(tag), 97):
+        assert carry_over(page[:cut]) == b""
+
+
+def test_open_link_tag_is_carried(tmp_path):
+    assert carry_over(b'text <a class="x" href="a<b') == b'<a class="x" href="a<b'
+    assert carry_over(b"text <") == b"<"
+    assert carry_over(b'<a href="done.html"> text <b') == b""
+    assert carry_over(b"<a " + b"x" * MAX_TAG_LENGTH) == b""
+
+    path = write_page(tmp_path, b'<p><a href="a<b.html">link</a></p>')
+    for chunk_size in range(1, 24):
+        assert extract_links(path, chunk_size) == {"a<b.html"}